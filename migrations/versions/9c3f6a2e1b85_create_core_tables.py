@@ -0,0 +1,74 @@
+"""create core tables
+
+Revision ID: 9c3f6a2e1b85
+Revises: 5b2e8c1d9a47
+Create Date: 2026-10-19 14:41:37.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f6a2e1b85'
+down_revision: Union[str, None] = '5b2e8c1d9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Earlier deployments created these tables with create_all at startup,
+    # so only create what is missing
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('book'):
+        op.create_table(
+            'book',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('author', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('isbn', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column('genres', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if not inspector.has_table('user'):
+        op.create_table(
+            'user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+            sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if not inspector.has_table('userbook'):
+        op.create_table(
+            'userbook',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('book_id', sa.Integer(), nullable=False),
+            sa.Column('rating', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['book_id'], ['book.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    # Finds recently changed books cheaply; the in-memory catalogue first
+    # used it for incremental refreshes before switching to LISTEN/NOTIFY
+    book_indexes = {index['name'] for index in inspector.get_indexes('book')}
+    if 'ix_book_updated_at' not in book_indexes:
+        op.create_index('ix_book_updated_at', 'book', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    # upgrade() may have adopted tables that predate Alembic and hold
+    # production data, so only the index is removed
+    op.drop_index('ix_book_updated_at', table_name='book')
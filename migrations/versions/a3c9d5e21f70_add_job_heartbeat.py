@@ -0,0 +1,27 @@
+"""add job heartbeat
+
+Revision ID: a3c9d5e21f70
+Revises: e7b5c2a8f614
+Create Date: 2026-10-19 21:04:37.512803
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9d5e21f70'
+down_revision: Union[str, None] = 'e7b5c2a8f614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets workers detect jobs orphaned by a crashed or restarted worker
+    op.add_column('job', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('job', 'heartbeat_at')
@@ -0,0 +1,30 @@
+"""add job cancel_requested
+
+Revision ID: c58e2b7d4a19
+Revises: a3c9d5e21f70
+Create Date: 2026-10-19 23:12:05.418276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e2b7d4a19'
+down_revision: Union[str, None] = 'a3c9d5e21f70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets any worker cancel a job running on another worker
+    op.add_column(
+        'job',
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('job', 'cancel_requested')
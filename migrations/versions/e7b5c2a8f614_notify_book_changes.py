@@ -0,0 +1,47 @@
+"""notify book changes
+
+Revision ID: e7b5c2a8f614
+Revises: d41a7e9f3c02
+Create Date: 2026-10-19 17:26:10.384920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b5c2a8f614'
+down_revision: Union[str, None] = 'd41a7e9f3c02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every committed change to a book is announced on the book_changes
+    # channel so each worker can update its in-memory state
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_book_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'book_changes',
+                json_build_object(
+                    'op', TG_OP,
+                    'id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER book_change_notify
+        AFTER INSERT OR UPDATE OR DELETE ON book
+        FOR EACH ROW EXECUTE FUNCTION notify_book_change()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS book_change_notify ON book")
+    op.execute("DROP FUNCTION IF EXISTS notify_book_change()")
@@ -0,0 +1,35 @@
+"""add recommender vectorizer table
+
+Revision ID: f3a81c6d2b94
+Revises: c58e2b7d4a19
+Create Date: 2026-10-19 23:47:31.206958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a81c6d2b94'
+down_revision: Union[str, None] = 'c58e2b7d4a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Vectorizer fitted once and shared by every recommender shard
+    op.create_table(
+        'recommender_vectorizer',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('vectorizer', sa.LargeBinary(), nullable=False),
+        sa.Column('book_count', sa.Integer(), nullable=False),
+        sa.Column('fitted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('recommender_vectorizer')
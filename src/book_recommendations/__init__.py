@@ -1,6 +1,18 @@
-from .core.app import BookRecommendationsApp
+import importlib
 from .models import Book, User, UserBook
-from .lib.book_recommender import BookRecommender
+
+# Imported on attribute access so that importing the package (e.g. from
+# Alembic) does not pull in the web app and ML stack
+_LAZY_ATTRIBUTES = {
+    "BookRecommendationsApp": ".core.app",
+    "BookRecommender": ".lib.book_recommender",
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     # Application
@@ -1,8 +1,30 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from sqlmodel import SQLModel
-from ..lib.database import engine, create_db_and_tables
+from sqlmodel import SQLModel, Session
+from ..lib.database import engine, replicas, schema_is_current
+from ..lib.config import RATE_LIMIT_BACKEND, SHARD_URLS
+from ..lib.catalogue import BookCatalogue
+from ..lib.dedup import DuplicateIndex
 from ..lib.book_recommender import BookRecommender
+from ..lib.sharding import SHARD_ONLY, ShardCoordinator
+from ..lib.jobs import JobRunner, rebuild_index, refit_vectorizer
+from ..lib.singleflight import SingleFlight
+from ..lib.rate_limit import RateLimiter, PostgresBucketStore
+from ..lib.notifications import BookChangeListener
+from ..models.Job import JOB_SUCCEEDED
+
+# Readiness states reported by /health/ready
+WARMING = "warming"
+READY = "ready"
+SCHEMA_OUTDATED = "schema_outdated"
+FAILED = "failed"
+
+# Seconds between schema checks while the database is behind the Alembic head
+SCHEMA_RECHECK_SECONDS = 30
+# Backoff between warm-up attempts after a failure, doubling up to the maximum
+WARMUP_RETRY_SECONDS = 5
+WARMUP_MAX_RETRY_SECONDS = 300
 
 class BookRecommendationsApp(FastAPI):
     """
@@ -11,7 +33,14 @@ class BookRecommendationsApp(FastAPI):
     This class extends FastAPI to provide:
     1. Database connection management
     2. ML model initialization
-    3. Graceful shutdown
+    3. In-memory catalogue for hydrating results, kept in sync across
+       workers through Postgres LISTEN/NOTIFY
+    4. Background jobs for long-running work
+    5. Graceful shutdown
+    
+    Startup only wires up cheap objects so the worker starts accepting
+    connections quickly; the catalogue and models load in the background
+    while readiness reports "warming".
     """
     def __init__(self, *args, **kwargs):
         """Initialize the application with lifespan management."""
@@ -28,22 +57,117 @@ class BookRecommendationsApp(FastAPI):
         
     async def _startup(self):
         """Initialize application resources."""
-        # Create database tables
-        create_db_and_tables()
+        self.state.readiness = WARMING
+        
+        # Per-key token buckets enforcing the documented rate limits
+        store = PostgresBucketStore() if RATE_LIMIT_BACKEND == "postgres" else None
+        self.state.rate_limiter = RateLimiter(store)
+        
+        # Columnar catalogue, loaded in the background. Shard processes
+        # serve only coordinators, so they skip it and the duplicate index
+        self.state.catalogue = None if SHARD_ONLY else BookCatalogue()
+        
+        # Applies book changes made by any worker to local state
+        self._listener = BookChangeListener(self)
         
         # Initialize ML models and other resources
-        self.state.recommender = BookRecommender()
+        self.state.duplicates = None if SHARD_ONLY else DuplicateIndex()
+        # With SHARD_URLS set this worker coordinates a sharded index
+        shards = ShardCoordinator(SHARD_URLS) if SHARD_URLS else None
+        self.state.recommender = BookRecommender(
+            catalogue=self.state.catalogue, duplicates=self.state.duplicates, shards=shards
+        )
+        
+        # Coalesces identical concurrent recommendation requests
+        self.state.inflight = SingleFlight()
+        
+        # Background jobs, e.g. index rebuilds, run off the request path
+        self.state.jobs = JobRunner(self)
+        self.state.jobs.register("rebuild_index", rebuild_index)
+        if SHARD_ONLY:
+            self.state.jobs.register("refit_vectorizer", refit_vectorizer)
+            
+        # Schema check, catalogue load and model fitting happen off the boot path
+        self._warmup_task = asyncio.create_task(self._warm_up())
         
         print("🚀 Application startup complete")
         
     async def _shutdown(self):
         """Cleanup application resources."""
+        if getattr(self, "_warmup_task", None) is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            
+        if hasattr(self, "_listener"):
+            await self._listener.stop()
+            
+        # Stop background jobs before tearing down what they use
+        if hasattr(self.state, "jobs"):
+            await self.state.jobs.shutdown()
+            
         # Close database connections
         if engine is not None:
             engine.dispose()
-            
+        replicas.dispose()
+        
         # Cleanup ML models
         if hasattr(self.state, "recommender"):
             await self.state.recommender.cleanup()
             
-        print("👋 Application shutdown complete") 
\ No newline at end of file
+        print("👋 Application shutdown complete")
+        
+    async def _warm_up(self):
+        """
+        Warm up, retrying with backoff until it succeeds.
+        
+        Failures are often transient (the database refusing connections
+        at boot, a rebuild interrupted by a restart), and liveness does not
+        depend on readiness, so giving up would leave a live worker that
+        never receives traffic.
+        """
+        delay = WARMUP_RETRY_SECONDS
+        while True:
+            try:
+                await self._warm_up_once()
+            except Exception as exc:
+                self.state.readiness = FAILED
+                print(f"❌ Warm-up failed, retrying in {delay:.0f}s: {exc}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WARMUP_MAX_RETRY_SECONDS)
+                continue
+                
+            self.state.readiness = READY
+            if self.state.catalogue is not None:
+                print(f"✅ Warm-up complete, {len(self.state.catalogue)} books loaded")
+            else:
+                print("✅ Warm-up complete, shard index loaded")
+            return
+            
+    async def _warm_up_once(self):
+        """Verify the schema, load the catalogue and fit the recommender index."""
+        # Wait for `alembic upgrade head` instead of needing a restart
+        while not await asyncio.to_thread(schema_is_current):
+            if self.state.readiness != SCHEMA_OUTDATED:
+                self.state.readiness = SCHEMA_OUTDATED
+                print("⚠️  Database schema is behind Alembic head, run `alembic upgrade head`")
+            await asyncio.sleep(SCHEMA_RECHECK_SECONDS)
+        self.state.readiness = WARMING
+        
+        # Heartbeats active jobs and fails ones left behind by dead workers
+        self.state.jobs.start()
+        
+        # Listen first so changes made during the load are not missed
+        await self._listener.start()
+        if self.state.catalogue is not None:
+            await asyncio.to_thread(self._load_catalogue)
+            
+        job = await self.state.jobs.submit("rebuild_index")
+        job = await self.state.jobs.wait(job.id)
+        if job is None or job.status != JOB_SUCCEEDED:
+            error = job.error if job is not None else "job row disappeared"
+            raise RuntimeError(f"index rebuild did not succeed: {error}")
+            
+    def _load_catalogue(self) -> None:
+        """Load the full catalogue. Blocking."""
+        with Session(engine) as session:
+            self.state.catalogue.load(session)
@@ -1,52 +1,586 @@
-from typing import List, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import openai
 import os
 from ..models.Book import Book, BookRead
-from sqlmodel import Session
-from .config import OPENAI_API_KEY
+from ..models.Shard import SHARD_MAX_LIMIT
+from sqlmodel import Session, select
+from .config import (
+    OPENAI_API_KEY,
+    RECOMMENDER_THREADS,
+    RECOMMENDER_MAX_PENDING,
+    RECOMMENDER_LSA_COMPONENTS,
+    RECOMMENDER_LSA_DTYPE,
+    RECOMMENDER_LSA_SAMPLE_SIZE,
+    RECOMMENDER_LSA_MAX_FEATURES,
+)
+from .catalogue import BookCatalogue
+from .dedup import DuplicateIndex
+from .sharding import ShardCoordinator, owns_book
+
+# Most recommendations one request may ask for
+MAX_RECOMMENDATIONS = 50
+# Candidates fetched per requested result when near-duplicates are dropped,
+# and the factor the fetch grows by while too few results survive
+OVERFETCH = 3
+FETCH_GROWTH = 4
+
+class RecommenderOverloaded(Exception):
+    """Raised when too many scoring calls are already queued."""
+
+def book_document(book: Book) -> str:
+    """Build the text representation of a book used for TF-IDF scoring."""
+    return f"{book.title} {book.description} {' '.join(book.genres)}"
+
+class LatentSemanticVectorizer:
+    """
+    TF-IDF followed by a truncated SVD projection (latent semantic analysis).
+    
+    Books become short dense vectors scaled to unit length, so cosine
+    similarity against every book is a single matrix-vector product.
+    Offers the same `transform` as TfidfVectorizer so the recommender can
+    use either.
+    """
+    
+    def __init__(self, tfidf, svd, dtype: str = "float32"):
+        """
+        Initialize the vectorizer.
+        
+        Args:
+            tfidf: Fitted TfidfVectorizer
+            svd: TruncatedSVD fitted on TF-IDF rows
+            dtype: Storage type of the dense vectors, "float32" or "float16"
+        """
+        self.tfidf = tfidf
+        self.svd = svd
+        self.dtype = np.dtype(dtype)
+        
+    def transform(self, documents: List[str]) -> np.ndarray:
+        """Project documents into the latent space."""
+        return self.project(self.tfidf.transform(documents))
+        
+    def project(self, tfidf_matrix, chunk_size: int = 10000) -> np.ndarray:
+        """
+        Project TF-IDF rows into unit-length dense vectors.
+        
+        Works in chunks so the float64 intermediate stays small.
+        """
+        vectors = np.empty((tfidf_matrix.shape[0], self.svd.n_components), dtype=self.dtype)
+        for start in range(0, tfidf_matrix.shape[0], chunk_size):
+            chunk = self.svd.transform(tfidf_matrix[start:start + chunk_size])
+            norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors[start:start + chunk_size] = chunk / norms
+        return vectors
+
+def _fit(documents: List[str], components: int, dtype: str, sample_size: int, max_features: int):
+    """
+    Fit TF-IDF, and the SVD in latent mode, over the given documents.
+    
+    Returns:
+        Tuple of the fitted vectorizer and the documents' TF-IDF matrix, None
+        if no document contains a term other than stop words
+    """
+    # Imported on first use; scikit-learn dominates import time
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    # The SVD stores one float per term and component, so latent mode caps the vocabulary
+    latent = components > 0
+    tfidf = TfidfVectorizer(stop_words='english', max_features=(max_features or None) if latent else None)
+    try:
+        tfidf_matrix = tfidf.fit_transform(documents)
+    except ValueError:
+        # Empty vocabulary; nothing to score against
+        return None
+    # TruncatedSVD needs fewer components than the matrix has columns
+    components = min(components, tfidf_matrix.shape[0], tfidf_matrix.shape[1] - 1)
+    if components <= 0:
+        return tfidf, tfidf_matrix
+        
+    from sklearn.decomposition import TruncatedSVD
+    
+    sample = tfidf_matrix
+    if tfidf_matrix.shape[0] > sample_size:
+        rng = np.random.default_rng(0)
+        sample = tfidf_matrix[np.sort(rng.choice(tfidf_matrix.shape[0], sample_size, replace=False))]
+    svd = TruncatedSVD(n_components=components, algorithm="randomized", random_state=0)
+    svd.fit(sample)
+    # Fitted components are float64; keep them at the storage type
+    svd.components_ = svd.components_.astype(dtype)
+    return LatentSemanticVectorizer(tfidf, svd, dtype), tfidf_matrix
+
+def build_tfidf_index(
+    documents: List[str],
+    components: int = RECOMMENDER_LSA_COMPONENTS,
+    dtype: str = RECOMMENDER_LSA_DTYPE,
+    sample_size: int = RECOMMENDER_LSA_SAMPLE_SIZE,
+    max_features: int = RECOMMENDER_LSA_MAX_FEATURES,
+):
+    """
+    Fit a TF-IDF vectorizer over the given documents.
+    
+    Defined at module level so it can be pickled and run in a worker process.
+    
+    Args:
+        documents: Text representation of each book
+        components: Dimensions of the latent semantic space; 0 keeps the
+            sparse TF-IDF matrix
+        dtype: Storage type of the dense vectors
+        sample_size: Books sampled to fit the SVD
+        max_features: Most frequent terms kept in latent mode; 0 keeps all
+        
+    Returns:
+        Tuple of the fitted vectorizer and the document-term matrix, or of a
+        LatentSemanticVectorizer and the dense book vectors; None if no
+        document contains a term other than stop words
+    """
+    fitted = _fit(documents, components, dtype, sample_size, max_features)
+    if fitted is not None and isinstance(fitted[0], LatentSemanticVectorizer):
+        vectorizer, tfidf_matrix = fitted
+        return vectorizer, vectorizer.project(tfidf_matrix)
+    return fitted
+
+def fit_vectorizer(
+    documents: List[str],
+    components: int = RECOMMENDER_LSA_COMPONENTS,
+    dtype: str = RECOMMENDER_LSA_DTYPE,
+    sample_size: int = RECOMMENDER_LSA_SAMPLE_SIZE,
+    max_features: int = RECOMMENDER_LSA_MAX_FEATURES,
+):
+    """
+    Fit a vectorizer without keeping the vectors of the documents.
+    
+    Used to fit one vectorizer on a sample of the whole catalogue for every
+    shard to share. Takes the same arguments as `build_tfidf_index`.
+    
+    Returns:
+        The fitted TfidfVectorizer or LatentSemanticVectorizer, None if no
+        document contains a term other than stop words
+    """
+    fitted = _fit(documents, components, dtype, sample_size, max_features)
+    return None if fitted is None else fitted[0]
+
+def vectorize(vectorizer, documents: List[str]):
+    """
+    Turn documents into index rows with an already fitted vectorizer.
+    
+    Defined at module level so it can be pickled and run in a worker process.
+    """
+    return vectorizer.transform(documents)
+
+def _similarities(tfidf_matrix, query) -> np.ndarray:
+    """Cosine similarity of every indexed book to one query vector."""
+    if isinstance(tfidf_matrix, np.ndarray):
+        # Latent vectors are unit length, so dot products are cosines
+        return _dense_scores(tfidf_matrix, query)
+    from sklearn.metrics.pairwise import cosine_similarity
+    
+    return cosine_similarity(tfidf_matrix, query).ravel()
+
+def _top_matches(scores: np.ndarray, book_ids: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+    """The `limit` best-scoring books with a positive score, best first."""
+    k = min(limit, len(scores))
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(int(book_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+def _dense_scores(vectors: np.ndarray, query: np.ndarray, block_size: int = 65536) -> np.ndarray:
+    """
+    Dot product of every row with the query vector.
+    
+    float32 goes straight to BLAS. NumPy has no BLAS path for float16, so
+    those rows are upcast one cache-sized block at a time.
+    """
+    query = query.astype(np.float32)
+    if vectors.dtype == np.float32:
+        return vectors @ query
+    scores = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        scores[start:start + block_size] = vectors[start:start + block_size].astype(np.float32) @ query
+    return scores
+
+def _make_index(tfidf, tfidf_matrix, book_ids: Iterable[int]) -> tuple:
+    """
+    Assemble an immutable index: (tfidf, matrix, book_ids, (sorted_ids, order)).
+    
+    Blocking and O(N log N); call it off the event loop. Rows are found by
+    binary search over the sorted IDs rather than through a dict.
+    """
+    book_ids = np.asarray(book_ids, dtype=np.int64)
+    order = np.argsort(book_ids, kind="stable")
+    return tfidf, tfidf_matrix, book_ids, (book_ids[order], order)
+
+def _row_of(index: tuple, book_id: Optional[int]) -> Optional[int]:
+    """Matrix row of a book in an index, None if it is not indexed."""
+    if book_id is None:
+        return None
+    sorted_ids, order = index[3]
+    i = int(np.searchsorted(sorted_ids, book_id))
+    if i < len(sorted_ids) and sorted_ids[i] == book_id:
+        return int(order[i])
+    return None
+
+def _latest_changes(changes: Iterable[Tuple[List[Book], List[int]]]) -> Tuple[List[Book], List[int]]:
+    """Collapse logged (books, deleted_ids) batches to the last change per book."""
+    latest: dict = {}
+    for books, deleted_ids in changes:
+        for book in books:
+            latest[book.id] = book
+        for book_id in deleted_ids:
+            latest[book_id] = None
+    books = [book for book in latest.values() if book is not None]
+    return books, [book_id for book_id, book in latest.items() if book is None]
 
 class BookRecommender:
     """
     Book recommendation engine using both traditional and AI-enhanced methods.
     """
     
-    def __init__(self, session: Session = None):
+    def __init__(
+        self,
+        session: Session = None,
+        catalogue: Optional[BookCatalogue] = None,
+        duplicates: Optional[DuplicateIndex] = None,
+        shards: Optional[ShardCoordinator] = None,
+        max_workers: int = RECOMMENDER_THREADS,
+        max_pending: int = RECOMMENDER_MAX_PENDING,
+    ):
         """
         Initialize the recommender.
         
         Args:
             session: Optional database session
+            catalogue: Optional in-memory catalogue used to hydrate results
+                without a database round trip
+            duplicates: Optional near-duplicate index used to drop other
+                editions of the same work from results
+            shards: Coordinator for a sharded index; when set, scoring is
+                delegated to the shard processes and no local index is kept
+            max_workers: Threads used for scoring; NumPy and SciPy release
+                the GIL during the heavy products
+            max_pending: Scoring calls allowed in flight or queued before
+                new calls are shed with RecommenderOverloaded
         """
         self.session = session
-        self.tfidf = TfidfVectorizer(stop_words='english')
+        self.catalogue = catalogue
+        self.duplicates = duplicates
+        self.shards = shards
+        self.tfidf = None
         self.tfidf_matrix = None
-        self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.book_ids = np.empty(0, dtype=np.int64)
+        self._index = None
+        # Changes seen while a rebuild runs, replayed onto its index
+        self._change_log: Optional[List[Tuple[List[Book], List[int]]]] = None
+        self._openai_client = None
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="recommender"
+        )
+        
+    @property
+    def openai_client(self):
+        """OpenAI client, created on first use to keep the import off the boot path."""
+        if self._openai_client is None:
+            import openai
+            
+            self._openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        return self._openai_client
         
     def _update_tfidf(self, books: List[Book]) -> None:
         """Update TF-IDF matrix with current books."""
-        descriptions = [f"{book.title} {book.description} {' '.join(book.genres)}" 
-                       for book in books]
-        self.tfidf_matrix = self.tfidf.fit_transform(descriptions)
+        tfidf, tfidf_matrix = build_tfidf_index([book_document(book) for book in books])
+        self._install(_make_index(tfidf, tfidf_matrix, [book.id for book in books]))
+        
+    def begin_rebuild(self) -> None:
+        """
+        Start logging book changes for the next load_index().
+        
+        Call it before reading the documents a rebuild is fitted on; the
+        changes applied in the meantime are replayed onto the new index.
+        """
+        self._change_log = []
+        
+    def end_rebuild(self) -> None:
+        """Stop logging book changes, e.g. after a failed rebuild."""
+        self._change_log = None
+        
+    async def load_index(self, tfidf, tfidf_matrix, book_ids: List[int]) -> None:
+        """
+        Install a fitted TF-IDF index.
+        
+        The index is assembled in a worker thread; only the final swap runs
+        on the event loop, so requests see either the old or the new index,
+        never a mix of both. Changes logged since begin_rebuild() are
+        applied to it first.
         
-    def get_traditional_recommendations(self, book: Book, limit: int = 5) -> List[BookRead]:
+        Args:
+            tfidf: Fitted TfidfVectorizer or LatentSemanticVectorizer
+            tfidf_matrix: Sparse document-term matrix or dense book
+                vectors, one row per book
+            book_ids: Book IDs aligned with the matrix rows
+        """
+        index = await asyncio.to_thread(_make_index, tfidf, tfidf_matrix, book_ids)
+        # More changes may be logged while earlier ones are applied
+        while self._change_log:
+            changes, self._change_log = self._change_log, []
+            books, deleted_ids = _latest_changes(changes)
+            index = await asyncio.to_thread(self._updated_index, index, books, deleted_ids)
+        self._change_log = None
+        self._install(index)
+        
+    def _install(self, index: tuple) -> None:
+        """Swap in an index built by _make_index. Constant time."""
+        self.tfidf, self.tfidf_matrix, self.book_ids = index[:3]
+        # Scoring threads read this single reference, never the attributes above
+        self._index = index
+        
+    @staticmethod
+    def _updated_index(index, books: List[Book], deleted_ids: Iterable[int]):
+        """
+        Build a copy of an index with books replaced, added or removed.
+        
+        New books are projected with the existing vocabulary (and latent
+        space); terms unseen at fit time are ignored until the next full
+        rebuild. Copies the matrix once per call, so callers should batch
+        changes.
+        """
+        from scipy import sparse
+        
+        tfidf, tfidf_matrix, book_ids, _ = index
+        changed = [book.id for book in books] + list(deleted_ids)
+        keep = ~np.isin(book_ids, changed)
+        matrices, ids = [tfidf_matrix[keep]], [book_ids[keep]]
+        if books:
+            matrices.append(tfidf.transform([book_document(book) for book in books]))
+            ids.append(np.asarray([book.id for book in books], dtype=np.int64))
+        if isinstance(tfidf_matrix, np.ndarray):
+            return _make_index(tfidf, np.concatenate(matrices), np.concatenate(ids))
+        return _make_index(tfidf, sparse.vstack(matrices, format="csr"), np.concatenate(ids))
+        
+    async def update_books(self, books: List[Book], deleted_ids: Iterable[int] = ()) -> None:
+        """
+        Apply book changes to the index without refitting it.
+        
+        The new index is built off the event loop and swapped in, unless a
+        concurrent rebuild installed a newer index meanwhile, in which case
+        the changes are applied on top of that one instead.
+        
+        Args:
+            books: Created or updated books; those owned by other shards
+                are ignored
+            deleted_ids: IDs of deleted books
+        """
+        books = [book for book in books if owns_book(book.id)]
+        deleted_ids = list(deleted_ids)
+        if self._change_log is not None:
+            # The running rebuild may have read these books before they changed
+            self._change_log.append((books, deleted_ids))
+        while True:
+            index = self._index
+            if index is None:
+                # Nothing to patch; a rebuild that has yet to read its
+                # documents sees current data, a running one gets the log
+                return
+            updated = await asyncio.to_thread(self._updated_index, index, books, deleted_ids)
+            if self._index is index:
+                self._install(updated)
+                return
+                
+    def _score(self, book_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Rank indexed books by cosine similarity to the given book.
+        
+        Runs on the scoring thread pool.
+        
+        Args:
+            book_id: ID of the source book
+            limit: Maximum number of results
+            
+        Returns:
+            List of (book_id, score) pairs, best first, or None if the book
+            is not indexed yet
+        """
+        index = self._index
+        if index is None:
+            return None
+        _, tfidf_matrix, book_ids, _ = index
+        row = _row_of(index, book_id)
+        if row is None:
+            return None
+            
+        scores = _similarities(tfidf_matrix, tfidf_matrix[row])
+        scores[row] = -1.0
+        return _top_matches(scores, book_ids, limit)
+        
+    def _unique(self, source_id: int, ranked: List[Tuple[int, float]], limit: int) -> List[int]:
+        """
+        Drop near-duplicates from ranked matches and cut them to `limit`.
+        
+        Runs on the scoring thread pool; comparing signatures costs up to
+        one check per kept book for every candidate.
+        """
+        ids = [book_id for book_id, _ in ranked]
+        if self.duplicates is not None:
+            ids = self.duplicates.filter_ranked(source_id, ids, limit)
+        return ids[:limit]
+        
+    def _rank(self, book_id: int, fetch: int, limit: int) -> Optional[List[int]]:
+        """
+        Score a book against the index and drop near-duplicates in one go.
+        
+        Runs on the scoring thread pool. A work with many editions can use
+        up the whole fetch, so it is widened and rescored until `limit`
+        results survive or every matching book has been considered.
+        
+        Returns:
+            Up to `limit` book IDs, best first, or None if the book is not
+            indexed yet
+        """
+        while True:
+            ranked = self._score(book_id, fetch)
+            if ranked is None:
+                return None
+            ids = self._unique(book_id, ranked, limit)
+            if len(ids) >= limit or len(ranked) < fetch:
+                return ids
+            fetch *= FETCH_GROWTH
+            
+    def _score_document(
+        self, document: str, limit: int, exclude_id: Optional[int] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Rank indexed books by cosine similarity to a free-text document.
+        
+        Runs on the scoring thread pool. Unlike _score, the source book need
+        not be indexed here, which is what lets a shard answer for books
+        held by other shards.
+        
+        Returns:
+            List of (book_id, score) pairs, best first, or None if no index
+            is loaded yet
+        """
+        index = self._index
+        if index is None:
+            return None
+        tfidf, tfidf_matrix, book_ids, _ = index
+        query = tfidf.transform([document])
+        if isinstance(query, np.ndarray):
+            query = query[0]
+            
+        scores = _similarities(tfidf_matrix, query)
+        row = _row_of(index, exclude_id)
+        if row is not None:
+            scores[row] = -1.0
+        return _top_matches(scores, book_ids, limit)
+        
+    async def search(
+        self, document: str, limit: int, exclude_id: Optional[int] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Rank the locally indexed books against a document.
+        
+        Serves the internal shard endpoint.
+        
+        Args:
+            document: Text representation of the source book
+            limit: Maximum number of results
+            exclude_id: Book to leave out, usually the source book
+            
+        Returns:
+            List of (book_id, score) pairs, best first, or None if no index
+            is loaded yet
+            
+        Raises:
+            RecommenderOverloaded: If the scoring queue is full
+        """
+        return await self._run_scoring(self._score_document, document, limit, exclude_id)
+        
+    async def _run_scoring(self, func: Callable, *args):
+        """
+        Run a scoring function on the thread pool without blocking the event loop.
+        
+        Raises:
+            RecommenderOverloaded: If max_pending calls are already in flight
+        """
+        # Only touched from the event loop, so a plain counter is enough
+        if self._pending >= self.max_pending:
+            raise RecommenderOverloaded()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            
+    async def get_traditional_recommendations(
+        self, book: Book, limit: int = 5, session: Optional[Session] = None
+    ) -> List[BookRead]:
         """
         Get book recommendations using traditional similarity metrics.
         
+        Scoring runs on the recommender's thread pool so the event loop keeps
+        serving other requests meanwhile, or on the shards in coordinator
+        mode. Database queries run in worker threads for the same reason.
+        
         Args:
             book: Source book to get recommendations for
             limit: Maximum number of recommendations to return
+            session: Database session, defaults to the one given at init
             
         Returns:
             List[BookRead]: List of recommended books
+            
+        Raises:
+            RecommenderOverloaded: If the scoring queue is full
+            ShardsUnavailable: If no shard answered in coordinator mode
         """
-        # Implement traditional recommendation logic
-        # For now, return a simple list of books
-        if self.session:
-            return self.session.query(Book).limit(limit).all()
-        return []
+        session = session or self.session
+        if session is None:
+            return []
+            
+        # Over-fetch so results still fill `limit` after dropping duplicates
+        fetch = limit * OVERFETCH if self.duplicates is not None else limit
+        if self.shards is not None:
+            # Shards reject larger queries
+            fetch = min(fetch, SHARD_MAX_LIMIT)
+            while True:
+                ranked = await self.shards.search(book_document(book), fetch, exclude_id=book.id)
+                ids = await self._run_scoring(self._unique, book.id, ranked, limit)
+                # Widen like _rank does, within what shards accept
+                if len(ids) >= limit or len(ranked) < fetch or fetch >= SHARD_MAX_LIMIT:
+                    break
+                fetch = min(fetch * FETCH_GROWTH, SHARD_MAX_LIMIT)
+        else:
+            ids = await self._run_scoring(self._rank, book.id, fetch, limit)
+        if ids is None:
+            # Index not built yet or book added since the last rebuild
+            return await asyncio.to_thread(
+                lambda: session.exec(select(Book).where(Book.id != book.id).limit(limit)).all()
+            )
+            
+        return await asyncio.to_thread(self.hydrate, ids, session)
+        
+    def hydrate(self, book_ids: List[int], session: Session) -> List[BookRead]:
+        """
+        Turn ranked book IDs into books, preserving order.
+        
+        Served from the in-memory catalogue where possible; only books it
+        does not hold yet are loaded from the database. Blocking.
+        """
+        if self.catalogue is not None and self.catalogue.loaded:
+            books = self.catalogue.get_many(book_ids)
+        else:
+            books = [None] * len(book_ids)
+            
+        missing = [book_id for book_id, book in zip(book_ids, books) if book is None]
+        if missing:
+            loaded = {b.id: b for b in session.exec(select(Book).where(Book.id.in_(missing)))}
+            books = [book or loaded.get(book_id) for book_id, book in zip(book_ids, books)]
+        return [book for book in books if book is not None]
         
     async def get_ai_recommendations(self, book: Book, limit: int = 5) -> List[str]:
         """
@@ -75,3 +609,7 @@ class BookRecommender:
         """
         # Cleanup any ML models or resources
         self.session = None
+        self._index = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.shards is not None:
+            await self.shards.close()
@@ -0,0 +1,320 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlmodel import Session, select
+from ..models.Book import Book, BookRead
+
+# Plain column tuples are far lighter to load than ORM instances
+_BOOK_COLUMNS = (
+    Book.id, Book.title, Book.author, Book.description, Book.isbn,
+    Book.genres, Book.created_at, Book.updated_at,
+)
+
+def _runs(rows: np.ndarray) -> List[Tuple[int, int]]:
+    """Split sorted row positions into [start, end) runs of consecutive rows."""
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    starts = rows[np.r_[0, breaks]]
+    ends = rows[np.r_[breaks - 1, len(rows) - 1]] + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def _ragged_take(values, offsets: np.ndarray, rows: np.ndarray):
+    """
+    Gather the values of sorted rows from a ragged column.
+    
+    Copies one slice per run of consecutive rows, so dropping a few rows
+    from a large column costs a few large copies rather than one per row.
+    
+    Returns:
+        Tuple of the gathered values (same type as `values`) and offsets
+    """
+    lengths = offsets[rows + 1] - offsets[rows]
+    new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    parts = [values[offsets[start]:offsets[end]] for start, end in _runs(rows)]
+    if isinstance(values, bytes):
+        return b"".join(parts), new_offsets
+    return (np.concatenate(parts) if parts else values[:0]), new_offsets
+
+def _concat_offsets(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Offsets of two ragged columns laid end to end."""
+    return np.concatenate([first, second[1:] + first[-1]])
+
+class _StringColumn:
+    """UTF-8 strings packed into one buffer, addressed by an offsets array."""
+    
+    __slots__ = ("buffer", "offsets")
+    
+    def __init__(self, values: Sequence[str]):
+        encoded = [value.encode("utf-8") for value in values]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.buffer = b"".join(encoded)
+        
+    @classmethod
+    def _from_parts(cls, buffer: bytes, offsets: np.ndarray) -> "_StringColumn":
+        column = cls.__new__(cls)
+        column.buffer, column.offsets = buffer, offsets
+        return column
+        
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+        
+    def __getitem__(self, i: int) -> str:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+        
+    def take(self, rows: np.ndarray) -> "_StringColumn":
+        """Strings at the given sorted rows."""
+        return self._from_parts(*_ragged_take(self.buffer, self.offsets, rows))
+        
+    def concat(self, other: "_StringColumn") -> "_StringColumn":
+        """This column followed by another."""
+        return self._from_parts(self.buffer + other.buffer, _concat_offsets(self.offsets, other.offsets))
+        
+    @property
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.offsets.nbytes
+
+class _CatalogueColumns:
+    """
+    Immutable column-oriented snapshot of the catalogue.
+    
+    Rows are in no particular order; `sorted_ids` and `order` find a
+    book's row by binary search. Descriptions are interned: identical
+    texts (common across editions) are stored once and referenced by slot.
+    """
+    
+    def __init__(self, books: Iterable):
+        books = list(books)
+        n = len(books)
+        self.ids = np.fromiter((book.id for book in books), dtype=np.int64, count=n)
+        self.titles = _StringColumn([book.title for book in books])
+        self.authors = _StringColumn([book.author for book in books])
+        self.isbns = _StringColumn([book.isbn or "" for book in books])
+        self.isbn_null = np.fromiter((book.isbn is None for book in books), dtype=bool, count=n)
+        
+        slots: Dict[str, int] = {}
+        self.description_slots = np.fromiter(
+            (slots.setdefault(book.description, len(slots)) for book in books),
+            dtype=np.int32,
+            count=n,
+        )
+        self.descriptions = _StringColumn(list(slots))
+        
+        genre_codes: Dict[str, int] = {}
+        codes = [genre_codes.setdefault(g, len(genre_codes)) for book in books for g in book.genres]
+        self.genre_names = list(genre_codes)
+        self.genre_codes = np.asarray(codes, dtype=np.int32)
+        self.genre_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter((len(book.genres) for book in books), dtype=np.int64, count=n),
+            out=self.genre_offsets[1:],
+        )
+        
+        self.created_at = np.array([book.created_at for book in books], dtype="datetime64[us]")
+        self.updated_at = np.array([book.updated_at for book in books], dtype="datetime64[us]")
+        self._index_ids()
+        
+    def _index_ids(self) -> None:
+        """Build the ID lookup used by rows()."""
+        self.order = np.argsort(self.ids, kind="stable")
+        self.sorted_ids = self.ids[self.order]
+        
+    def __len__(self) -> int:
+        return len(self.ids)
+        
+    @property
+    def nbytes(self) -> int:
+        arrays = (
+            self.ids, self.isbn_null, self.description_slots, self.genre_codes,
+            self.genre_offsets, self.created_at, self.updated_at, self.order, self.sorted_ids,
+        )
+        columns = (self.titles, self.authors, self.isbns, self.descriptions)
+        return sum(a.nbytes for a in arrays) + sum(c.nbytes for c in columns)
+        
+    def rows(self, book_ids: np.ndarray) -> np.ndarray:
+        """Row positions of the given IDs, -1 where absent."""
+        if not len(self.ids):
+            return np.full(len(book_ids), -1, dtype=np.int64)
+        positions = np.searchsorted(self.sorted_ids, book_ids)
+        positions = np.minimum(positions, len(self.ids) - 1)
+        return np.where(self.sorted_ids[positions] == book_ids, self.order[positions], -1)
+        
+    def merged(self, rows: np.ndarray, other: "_CatalogueColumns") -> "_CatalogueColumns":
+        """
+        New snapshot with the given sorted rows of this one followed by
+        every row of another.
+        
+        Works column by column, without materializing any book. The
+        other's descriptions are not interned against this snapshot's, so
+        an updated book keeps its own copy until the next full load.
+        """
+        merged = _CatalogueColumns.__new__(_CatalogueColumns)
+        merged.ids = np.concatenate([self.ids[rows], other.ids])
+        merged.titles = self.titles.take(rows).concat(other.titles)
+        merged.authors = self.authors.take(rows).concat(other.authors)
+        merged.isbns = self.isbns.take(rows).concat(other.isbns)
+        merged.isbn_null = np.concatenate([self.isbn_null[rows], other.isbn_null])
+        
+        # Keep only descriptions still referenced, then append the other's
+        used, slots = np.unique(self.description_slots[rows], return_inverse=True)
+        merged.descriptions = self.descriptions.take(used).concat(other.descriptions)
+        merged.description_slots = np.concatenate(
+            [slots.astype(np.int32), other.description_slots + np.int32(len(used))]
+        )
+        
+        names = {name: code for code, name in enumerate(self.genre_names)}
+        remap = np.fromiter(
+            (names.setdefault(name, len(names)) for name in other.genre_names),
+            dtype=np.int32,
+            count=len(other.genre_names),
+        )
+        codes, offsets = _ragged_take(self.genre_codes, self.genre_offsets, rows)
+        merged.genre_names = list(names)
+        merged.genre_codes = np.concatenate([codes, remap[other.genre_codes]]).astype(np.int32)
+        merged.genre_offsets = _concat_offsets(offsets, other.genre_offsets)
+        
+        merged.created_at = np.concatenate([self.created_at[rows], other.created_at])
+        merged.updated_at = np.concatenate([self.updated_at[rows], other.updated_at])
+        merged._index_ids()
+        return merged
+        
+    def book(self, row: int) -> BookRead:
+        """Materialize a single row."""
+        start, end = self.genre_offsets[row], self.genre_offsets[row + 1]
+        return BookRead(
+            id=int(self.ids[row]),
+            title=self.titles[row],
+            author=self.authors[row],
+            description=self.descriptions[self.description_slots[row]],
+            isbn=None if self.isbn_null[row] else self.isbns[row],
+            genres=[self.genre_names[code] for code in self.genre_codes[start:end]],
+            created_at=self.created_at[row].item(),
+            updated_at=self.updated_at[row].item(),
+        )
+
+class BookCatalogue:
+    """
+    Read-optimized in-memory copy of the book catalogue.
+    
+    Used to hydrate recommendation results into BookRead objects without a
+    database round trip. Rows live in a columnar snapshot; books changed
+    since the snapshot was built sit in a small overlay and are folded into
+    a fresh snapshot once the overlay grows past `compact_ratio`.
+    
+    Hydration never locks: it reads one `(columns, overlay, deleted)` tuple.
+    Writers serialize on a lock and publish a new tuple when compacting.
+    """
+    
+    def __init__(self, compact_ratio: float = 0.1, min_compact: int = 1000):
+        """
+        Initialize an empty catalogue.
+        
+        Args:
+            compact_ratio: Overlay size, relative to the snapshot, that
+                triggers a compaction
+            min_compact: Overlay size below which compaction never happens
+        """
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self.loaded = False
+        self._state = (_CatalogueColumns([]), {}, set())
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # Changes applied while a load runs, as (book_id, book or None)
+        self._journal: Optional[List[Tuple[int, Optional[BookRead]]]] = None
+        
+    def __len__(self) -> int:
+        with self._lock:
+            columns, overlay, deleted = self._state
+            # Overlay books and deletions only hide snapshot rows that exist
+            hidden = columns.rows(np.fromiter([*overlay, *deleted], dtype=np.int64))
+            return len(columns) + len(overlay) - np.count_nonzero(hidden >= 0)
+            
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columnar snapshot."""
+        return self._state[0].nbytes
+        
+    def load(self, session: Session) -> None:
+        """
+        Replace the catalogue with a full copy of the book table.
+        
+        Changes applied through `upsert` and `discard` while the copy is
+        read are recorded and replayed on top of it, so they are not lost
+        when the older snapshot is swapped in. Blocking; call it from a
+        worker thread.
+        """
+        with self._load_lock:
+            with self._lock:
+                self._journal = []
+            try:
+                columns = _CatalogueColumns(session.exec(select(*_BOOK_COLUMNS)).all())
+            except BaseException:
+                with self._lock:
+                    self._journal = None
+                raise
+                
+            with self._lock:
+                overlay: Dict[int, BookRead] = {}
+                deleted = set()
+                for book_id, book in self._journal:
+                    if book is None:
+                        overlay.pop(book_id, None)
+                        deleted.add(book_id)
+                    else:
+                        overlay[book_id] = book
+                        deleted.discard(book_id)
+                self._journal = None
+                self._state = (columns, overlay, deleted)
+                self.loaded = True
+                
+    def upsert(self, book: Book) -> None:
+        """Insert or replace a single book."""
+        book = BookRead.model_validate(book)
+        with self._lock:
+            columns, overlay, deleted = self._state
+            overlay[book.id] = book
+            deleted.discard(book.id)
+            if self._journal is not None:
+                self._journal.append((book.id, book))
+            if len(overlay) > max(self.min_compact, self.compact_ratio * len(columns)):
+                self._compact()
+                
+    def discard(self, book_id: int) -> None:
+        """Remove a single book."""
+        with self._lock:
+            columns, overlay, deleted = self._state
+            overlay.pop(book_id, None)
+            deleted.add(book_id)
+            if self._journal is not None:
+                self._journal.append((book_id, None))
+                
+    def _compact(self) -> None:
+        """Fold the overlay and deletions into a new snapshot. Caller holds the lock."""
+        columns, overlay, deleted = self._state
+        replaced = columns.rows(np.fromiter([*overlay, *deleted], dtype=np.int64))
+        keep = np.ones(len(columns), dtype=bool)
+        keep[replaced[replaced >= 0]] = False
+        self._state = (columns.merged(np.flatnonzero(keep), _CatalogueColumns(overlay.values())), {}, set())
+        
+    def get_many(self, book_ids: Sequence[int]) -> List[Optional[BookRead]]:
+        """
+        Hydrate books by ID, preserving order.
+        
+        Returns:
+            List[Optional[BookRead]]: None for IDs not in the catalogue
+        """
+        columns, overlay, deleted = self._state
+        rows = columns.rows(np.asarray(book_ids, dtype=np.int64))
+        books: List[Optional[BookRead]] = []
+        for book_id, row in zip(map(int, book_ids), rows):
+            if book_id in overlay:
+                books.append(overlay[book_id])
+            elif book_id in deleted or row < 0:
+                books.append(None)
+            else:
+                books.append(columns.book(int(row)))
+        return books
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -14,10 +15,67 @@ DB_USER = os.environ.get("POSTGRES_USER")
 DB_PASSWORD = os.environ.get("POSTGRES_PASSWORD")
 DB_NAME = os.environ.get("POSTGRES_DB")
 DB_URL = os.environ.get("POSTGRES_URL")
+# Optional comma-separated read replicas used by read-only endpoints
+DB_REPLICA_URLS = [
+    url.strip() for url in os.environ.get("POSTGRES_REPLICA_URLS", "").split(",") if url.strip()
+]
+# Seconds a failed replica is skipped before it is tried again
+DB_REPLICA_RETRY_SECONDS = float(os.environ.get("POSTGRES_REPLICA_RETRY_SECONDS", 30))
+# libpq connect timeout for replicas, so a blackholed host fails over quickly
+DB_REPLICA_CONNECT_TIMEOUT_SECONDS = int(os.environ.get("POSTGRES_REPLICA_CONNECT_TIMEOUT_SECONDS", 3))
+# Seconds after a client's write during which its reads stay on the primary
+DB_READ_YOUR_WRITES_SECONDS = float(os.environ.get("POSTGRES_READ_YOUR_WRITES_SECONDS", 10))
+ALEMBIC_SCRIPT_LOCATION = os.environ.get(
+    "ALEMBIC_SCRIPT_LOCATION",
+    str(Path(__file__).resolve().parents[3] / "migrations"),
+)
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Recommender Configuration
+RECOMMENDER_THREADS = int(os.environ.get("RECOMMENDER_THREADS", 4))
+RECOMMENDER_MAX_PENDING = int(os.environ.get("RECOMMENDER_MAX_PENDING", 64))
+# Latent semantic mode: dimensions of the dense book vectors, 0 keeps sparse TF-IDF
+RECOMMENDER_LSA_COMPONENTS = int(os.environ.get("RECOMMENDER_LSA_COMPONENTS", 0))
+# "float32" or "float16"; float16 halves memory at some cost in scoring speed
+RECOMMENDER_LSA_DTYPE = os.environ.get("RECOMMENDER_LSA_DTYPE", "float32")
+# Books sampled to fit the SVD; all books are projected afterwards
+RECOMMENDER_LSA_SAMPLE_SIZE = int(os.environ.get("RECOMMENDER_LSA_SAMPLE_SIZE", 50000))
+# Vocabulary cap in latent mode, keeping the SVD components small; 0 keeps every term
+RECOMMENDER_LSA_MAX_FEATURES = int(os.environ.get("RECOMMENDER_LSA_MAX_FEATURES", 200000))
+
+# Rate Limit Configuration
+# "local" keeps buckets per worker, "postgres" shares them across workers
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "local")
+RATE_LIMIT_STANDARD_PER_MINUTE = int(os.environ.get("RATE_LIMIT_STANDARD_PER_MINUTE", 100))
+RATE_LIMIT_AI_PER_MINUTE = int(os.environ.get("RATE_LIMIT_AI_PER_MINUTE", 10))
+# Seconds to use local buckets only after the shared store fails
+RATE_LIMIT_STORE_COOLDOWN_SECONDS = float(os.environ.get("RATE_LIMIT_STORE_COOLDOWN_SECONDS", 30))
+
+# Background Job Configuration
+JOB_PROCESS_WORKERS = int(os.environ.get("JOB_PROCESS_WORKERS", 1))
+# Active jobs are touched this often; rows silent for 3 intervals are orphans
+JOB_HEARTBEAT_SECONDS = float(os.environ.get("JOB_HEARTBEAT_SECONDS", 30))
+
+# Sharding Configuration
+# Each shard process scores only the books it owns: book_id % SHARD_COUNT ==
+# SHARD_ID ("hash"), or contiguous blocks of SHARD_RANGE_SIZE IDs ("range")
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", 1))
+SHARD_ID = int(os.environ.get("SHARD_ID", 0))
+SHARD_PARTITION = os.environ.get("SHARD_PARTITION", "hash")
+SHARD_RANGE_SIZE = int(os.environ.get("SHARD_RANGE_SIZE", 100000))
+# Coordinator mode: comma-separated shard base URLs to fan queries out to
+SHARD_URLS = [
+    url.strip().rstrip("/") for url in os.environ.get("SHARD_URLS", "").split(",") if url.strip()
+]
+SHARD_TIMEOUT_SECONDS = float(os.environ.get("SHARD_TIMEOUT_SECONDS", 0.5))
+# Books sampled from the whole catalogue to fit the vectorizer all shards share
+SHARD_VECTORIZER_SAMPLE_SIZE = int(os.environ.get("SHARD_VECTORIZER_SAMPLE_SIZE", 200000))
+# Shared secret between coordinator and shards, separate from the public API key;
+# the internal shard endpoint rejects every call while it is unset
+SHARD_TOKEN = os.environ.get("SHARD_TOKEN")
+
 # PgAdmin Configuration
 PGADMIN_EMAIL = os.environ.get("PGADMIN_EMAIL")
 PGADMIN_PASSWORD = os.environ.get("PGADMIN_PASSWORD")
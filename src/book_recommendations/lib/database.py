@@ -1,14 +1,166 @@
-from sqlmodel import SQLModel, create_engine
-from .config import DB_URL
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, Optional
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine
+from .config import (
+    DB_URL,
+    DB_REPLICA_URLS,
+    DB_REPLICA_RETRY_SECONDS,
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS,
+    DB_READ_YOUR_WRITES_SECONDS,
+    ALEMBIC_SCRIPT_LOCATION,
+)
 
 # Database configuration
 engine = create_engine(DB_URL)
 
+class ReplicaRouter:
+    """
+    Routes read-only sessions to read replicas.
+    
+    Replicas are used round-robin. A replica whose connection fails is
+    skipped for `retry_after` seconds, and reads fall back to the primary
+    when none is available. Clients that wrote recently read from the
+    primary so they see their own writes despite replication lag; the time
+    of a client's last write travels with the client (see
+    dependencies.last_write_at), so no per-worker state is needed.
+    """
+    
+    def __init__(
+        self,
+        engines: List[Engine],
+        retry_after: float = DB_REPLICA_RETRY_SECONDS,
+        sticky_for: float = DB_READ_YOUR_WRITES_SECONDS,
+    ):
+        """
+        Initialize the router.
+        
+        Args:
+            engines: One engine per replica
+            retry_after: Seconds a failed replica sits out
+            sticky_for: Seconds after a write during which the writing
+                client reads from the primary
+        """
+        self.engines = engines
+        self.retry_after = retry_after
+        self.sticky_for = sticky_for
+        self._turn = itertools.count()
+        self._down_until = [0.0] * len(engines)
+        
+    def wants_primary(self, last_write: Optional[float]) -> bool:
+        """
+        Whether a client's last write falls within the stickiness window.
+        
+        Args:
+            last_write: Epoch seconds of the client's last write, if known
+        """
+        if not self.engines:
+            return True
+        if last_write is None:
+            return False
+        return 0 <= time.time() - last_write < self.sticky_for
+        
+    def _connect(self):
+        """Check out a connection from the next healthy replica, or None."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            i = next(self._turn) % len(self.engines)
+            if self._down_until[i] > now:
+                continue
+            try:
+                return self.engines[i].connect()
+            except OperationalError as exc:
+                self._down_until[i] = now + self.retry_after
+                print(f"⚠️  Read replica {i} unavailable, failing over: {exc}")
+        return None
+        
+    @contextmanager
+    def session(self, use_primary: bool = False) -> Iterator[Session]:
+        """
+        Open a read-only session on a replica, or on the primary if needed.
+        
+        Blocking while a replica connection is checked out; async code
+        should use async_session instead.
+        
+        Args:
+            use_primary: Force the primary, e.g. for a client that just wrote
+        """
+        connection = None if use_primary else self._connect()
+        with self._session(connection) as session:
+            yield session
+            
+    @asynccontextmanager
+    async def async_session(self, use_primary: bool = False) -> AsyncIterator[Session]:
+        """Like session, but checks out the replica connection in a worker thread."""
+        connection = None if use_primary else await asyncio.to_thread(self._connect)
+        with self._session(connection) as session:
+            yield session
+            
+    @contextmanager
+    def _session(self, connection) -> Iterator[Session]:
+        """Session bound to a replica connection, or to the primary if None."""
+        if connection is None:
+            with Session(engine) as session:
+                yield session
+            return
+        try:
+            with Session(bind=connection) as session:
+                yield session
+        finally:
+            connection.close()
+            
+    def dispose(self) -> None:
+        """Close all replica connection pools."""
+        for replica in self.engines:
+            replica.dispose()
+
+# pool_pre_ping turns a dead replica into a connect error we can fail over on
+replicas = ReplicaRouter([
+    create_engine(
+        url,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": DB_REPLICA_CONNECT_TIMEOUT_SECONDS},
+    )
+    for url in DB_REPLICA_URLS
+])
+
 def create_db_and_tables():
     """
     Create all database tables defined by SQLModel models.
     
-    This function should be called when the application starts up to ensure
-    all necessary database tables exist.
+    Intended for tests and throwaway databases; the application itself
+    expects the schema to be managed by Alembic (see schema_is_current).
     """
-    SQLModel.metadata.create_all(engine) 
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+
+def schema_is_current() -> bool:
+    """
+    Check whether the database is migrated to the Alembic head revision.
+    
+    Much cheaper than reflecting and creating tables on every boot, and it
+    catches deployments that forgot to run `alembic upgrade head`. A
+    revision this code does not know was added by a newer release, so the
+    database is ahead rather than behind; accepting it keeps older workers
+    serving during a rolling deploy.
+    
+    Returns:
+        bool: True if every current revision is a migration head or newer
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_SCRIPT_LOCATION)
+    script = ScriptDirectory.from_config(config)
+    heads = set(script.get_heads())
+    known = {revision.revision for revision in script.walk_revisions()}
+    
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    # Known revisions that are not heads are behind
+    return bool(current) and all(rev in heads or rev not in known for rev in current)
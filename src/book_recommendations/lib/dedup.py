@@ -0,0 +1,289 @@
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from ..models.Book import Book
+
+NUM_PERM = 64
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# Pairs above roughly (1 / BANDS) ** (1 / ROWS) ~ 0.77 Jaccard similarity
+# share at least one band and become candidates
+DEFAULT_THRESHOLD = 0.8
+# Most matches one lookup may return
+MAX_DUPLICATES = 100
+
+_PRIME = np.uint64((1 << 61) - 1)
+_EMPTY = np.uint32(0xFFFFFFFF)
+_TOKEN = re.compile(r"\w+")
+
+def dedup_document(book: Book) -> str:
+    """Build the text compared when looking for near-duplicate books."""
+    return f"{book.title} {book.author} {book.description}"
+
+def _permutations(seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Coefficients of the NUM_PERM universal hash functions."""
+    rng = np.random.default_rng(seed)
+    # Below 2**31 so a * shingle + b never overflows uint64
+    a = rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+    return a, b
+
+_A, _B = _permutations()
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature of a text's word trigrams.
+    
+    Text without any tokens gets an all-empty signature; see `_is_empty`.
+    
+    Returns:
+        np.ndarray: NUM_PERM uint32 values
+    """
+    tokens = _TOKEN.findall(text.lower())
+    shingles = {" ".join(tokens[i:i + 3]) for i in range(max(len(tokens) - 2, 1))}
+    shingles.discard("")
+    if not shingles:
+        return np.full(NUM_PERM, _EMPTY, dtype=np.uint32)
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    permuted = (hashes[:, None] * _A + _B) % _PRIME
+    return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+def _is_empty(signature: np.ndarray) -> bool:
+    """Whether a signature belongs to a text without tokens, which never matches."""
+    return bool((signature == _EMPTY).all())
+
+def minhash_signatures(documents: List[str]) -> np.ndarray:
+    """
+    Signatures for many documents, one row each.
+    
+    Defined at module level so it can be pickled and run in a worker process.
+    """
+    signatures = np.empty((len(documents), NUM_PERM), dtype=np.uint32)
+    for row, document in enumerate(documents):
+        signatures[row] = minhash_signature(document)
+    return signatures
+
+def _band_keys(signatures: np.ndarray) -> np.ndarray:
+    """Hash each band of ROWS values into one uint64 key, shape (n, BANDS)."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(ROWS):
+            keys = keys * np.uint64(0x100000001B3) + bands[:, :, r]
+    return keys
+
+class _SignatureTable:
+    """
+    Immutable MinHash/LSH table, sorted by book ID.
+    
+    Each band's keys are kept sorted so candidates are found by binary
+    search rather than by scanning every book.
+    """
+    
+    def __init__(self, book_ids: np.ndarray, signatures: np.ndarray):
+        order = np.argsort(book_ids, kind="stable")
+        self.ids = np.asarray(book_ids, dtype=np.int64)[order]
+        self.signatures = signatures[order]
+        keys = _band_keys(self.signatures)
+        self.band_order = np.argsort(keys, axis=0, kind="stable").T
+        self.band_keys = np.take_along_axis(keys.T, self.band_order, axis=1)
+        
+    def row(self, book_id: int) -> int:
+        """Row of a book ID, -1 if absent."""
+        row = int(np.searchsorted(self.ids, book_id))
+        return row if row < len(self.ids) and self.ids[row] == book_id else -1
+        
+    def candidates(self, keys: np.ndarray) -> np.ndarray:
+        """Rows sharing at least one band key."""
+        rows = []
+        for band in range(BANDS):
+            lo = np.searchsorted(self.band_keys[band], keys[band], side="left")
+            hi = np.searchsorted(self.band_keys[band], keys[band], side="right")
+            rows.append(self.band_order[band, lo:hi])
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+class DuplicateIndex:
+    """
+    Near-duplicate detector for editions and reprints of the same work.
+    
+    Books are compared by MinHash signatures of `title + author +
+    description`; locality-sensitive hashing over signature bands finds
+    candidates without comparing every pair. Books added after the last
+    bulk load sit in a small overlay that is scanned directly and folded
+    into the table once it grows past `compact_size`.
+    """
+    
+    def __init__(self, compact_size: int = 1000):
+        """
+        Initialize an empty index.
+        
+        Args:
+            compact_size: Overlay size that triggers a rebuild of the table
+        """
+        self.compact_size = compact_size
+        self._table = _SignatureTable(np.empty(0, dtype=np.int64), np.empty((0, NUM_PERM), dtype=np.uint32))
+        self._overlay: Dict[int, np.ndarray] = {}
+        self._removed: Set[int] = set()
+        self._lock = threading.Lock()
+        # Changes applied since begin_load(), as (book_id, signature or None)
+        self._journal: Optional[List[Tuple[int, Optional[np.ndarray]]]] = None
+        
+    def begin_load(self) -> None:
+        """
+        Start recording changes for the next load().
+        
+        Call it before reading the books whose signatures will be loaded;
+        changes applied in between are replayed on top of the new table.
+        """
+        with self._lock:
+            self._journal = []
+            
+    def end_load(self) -> None:
+        """Stop recording changes, e.g. after a failed rebuild."""
+        with self._lock:
+            self._journal = None
+            
+    def load(self, book_ids: Sequence[int], signatures: np.ndarray) -> None:
+        """
+        Replace the index with precomputed signatures.
+        
+        Blocking; call it from a worker thread.
+        """
+        table = _SignatureTable(np.asarray(book_ids, dtype=np.int64), signatures)
+        with self._lock:
+            overlay: Dict[int, np.ndarray] = {}
+            removed: Set[int] = set()
+            for book_id, signature in self._journal or ():
+                removed.add(book_id)
+                if signature is None:
+                    overlay.pop(book_id, None)
+                else:
+                    overlay[book_id] = signature
+            self._table, self._overlay, self._removed = table, overlay, removed
+            self._journal = None
+            
+    def upsert(self, book: Book) -> None:
+        """Add or replace a single book."""
+        signature = minhash_signature(dedup_document(book))
+        with self._lock:
+            self._overlay[book.id] = signature
+            self._removed.add(book.id)
+            if self._journal is not None:
+                self._journal.append((book.id, signature))
+            if len(self._overlay) >= self.compact_size:
+                self._compact()
+                
+    def discard(self, book_id: int) -> None:
+        """Remove a single book."""
+        with self._lock:
+            self._overlay.pop(book_id, None)
+            self._removed.add(book_id)
+            if self._journal is not None:
+                self._journal.append((book_id, None))
+                
+    def _compact(self) -> None:
+        """Fold the overlay into a new table. Caller holds the lock."""
+        table = self._table
+        keep = ~np.isin(table.ids, list(self._removed))
+        overlay_ids = np.fromiter(self._overlay, dtype=np.int64, count=len(self._overlay))
+        signatures = np.concatenate(
+            [table.signatures[keep], np.stack(list(self._overlay.values()))]
+        ) if self._overlay else table.signatures[keep]
+        self._table = _SignatureTable(np.concatenate([table.ids[keep], overlay_ids]), signatures)
+        self._overlay, self._removed = {}, set()
+        
+    def signature(self, book_id: int) -> Optional[np.ndarray]:
+        """Current signature of an indexed book."""
+        signature = self._overlay.get(book_id)
+        if signature is not None:
+            return signature
+        if book_id in self._removed:
+            return None
+        row = self._table.row(book_id)
+        return self._table.signatures[row] if row >= 0 else None
+        
+    def similarity(self, first: int, second: int) -> float:
+        """Estimated Jaccard similarity of two indexed books, 0 if either is missing or empty."""
+        a, b = self.signature(first), self.signature(second)
+        if a is None or b is None or _is_empty(a) or _is_empty(b):
+            return 0.0
+        return float(np.mean(a == b))
+        
+    def find(
+        self,
+        book: Book,
+        threshold: float = DEFAULT_THRESHOLD,
+        limit: int = 20,
+    ) -> List[Tuple[int, float]]:
+        """
+        Find near-duplicates of a book.
+        
+        Args:
+            book: Book to look up; need not be indexed yet
+            threshold: Minimum estimated Jaccard similarity
+            limit: Maximum number of results
+            
+        Returns:
+            List of (book_id, similarity) pairs, most similar first
+        """
+        signature = self.signature(book.id)
+        if signature is None:
+            signature = minhash_signature(dedup_document(book))
+        if _is_empty(signature):
+            # Texts without tokens share one signature but are not duplicates
+            return []
+        keys = _band_keys(signature[None, :])[0]
+        
+        with self._lock:
+            table, overlay, removed = self._table, dict(self._overlay), set(self._removed)
+            
+        matches: Dict[int, float] = {}
+        rows = table.candidates(keys)
+        if len(rows):
+            similarity = np.mean(table.signatures[rows] == signature, axis=1)
+            for book_id, score in zip(table.ids[rows], similarity):
+                if score >= threshold and int(book_id) not in removed:
+                    matches[int(book_id)] = float(score)
+        for book_id, other in overlay.items():
+            score = float(np.mean(other == signature))
+            if score >= threshold:
+                matches[book_id] = score
+        matches.pop(book.id, None)
+        
+        ranked = sorted(matches.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+        
+    def filter_ranked(
+        self,
+        source_id: int,
+        book_ids: Iterable[int],
+        limit: int,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> List[int]:
+        """
+        Drop near-duplicates from a ranked list of books.
+        
+        A book is dropped if it duplicates the source book or any book
+        ranked above it.
+        
+        Args:
+            source_id: Book the list was produced for
+            book_ids: Ranked book IDs, best first
+            limit: Maximum number of IDs to keep
+            threshold: Minimum estimated Jaccard similarity to count as duplicate
+            
+        Returns:
+            List[int]: Ranked IDs with duplicates removed
+        """
+        kept: List[int] = []
+        for book_id in book_ids:
+            if any(self.similarity(book_id, other) >= threshold for other in [source_id, *kept]):
+                continue
+            kept.append(book_id)
+            if len(kept) == limit:
+                break
+        return kept
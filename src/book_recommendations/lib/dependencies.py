@@ -1,12 +1,60 @@
+import math
+import time
+from typing import Optional
+from fastapi import Request, Response
 from sqlmodel import Session
-from .database import engine
+from .database import engine, replicas
 
-def get_session():
+# Returned on every write and echoed back by clients, as a header or cookie
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+
+def last_write_at(request: Request) -> Optional[float]:
+    """
+    Epoch seconds of the caller's last write, for read-your-writes routing.
+    
+    Taken from the X-Last-Write header, else the last_write cookie. The API
+    key cannot identify a client since every client shares it.
+    """
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+def get_session(request: Request, response: Response):
     """
     FastAPI dependency that provides a SQLModel database session.
     
+    Always bound to the primary. Non-GET requests also return the write
+    time as an X-Last-Write header and cookie; clients that send it back
+    read from the primary for a short while (read-your-writes).
+    
     Yields:
         Session: Database session that will be automatically closed after use
     """
+    if request.method not in ("GET", "HEAD", "OPTIONS") and replicas.engines:
+        stamp = f"{time.time():.3f}"
+        response.headers[LAST_WRITE_HEADER] = stamp
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            stamp,
+            max_age=math.ceil(replicas.sticky_for),
+            httponly=True,
+            samesite="lax",
+        )
     with Session(engine) as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+def get_read_session(request: Request):
+    """
+    FastAPI dependency that provides a read-only SQLModel database session.
+    
+    Served by a read replica when any are configured and healthy, otherwise
+    by the primary.
+    
+    Yields:
+        Session: Database session that will be automatically closed after use
+    """
+    with replicas.session(use_primary=replicas.wants_primary(last_write_at(request))) as session:
+        yield session
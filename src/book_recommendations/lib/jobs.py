@@ -0,0 +1,511 @@
+import asyncio
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import FastAPI
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from .database import engine
+from .config import JOB_PROCESS_WORKERS, JOB_HEARTBEAT_SECONDS, SHARD_VECTORIZER_SAMPLE_SIZE
+from .book_recommender import book_document, build_tfidf_index, fit_vectorizer, vectorize
+from .dedup import dedup_document, minhash_signatures
+from .sharding import SHARD_ONLY, shard_filter
+from ..models.Book import Book
+from ..models.RecommenderVectorizer import RecommenderVectorizer
+from ..models.Job import (
+    Job,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JOB_FAILED,
+    JOB_CANCELLED,
+    JOB_FINAL_STATES,
+)
+
+JobFunction = Callable[["JobContext"], Awaitable[Any]]
+
+# Row of the recommender_vectorizer table shared by the shards
+SHARD_VECTORIZER = "shards"
+
+def _update_job(job_id: int, **fields) -> None:
+    """Persist field changes on a job row."""
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        if job is None:
+            return
+        for key, value in fields.items():
+            setattr(job, key, value)
+        session.add(job)
+        session.commit()
+
+def _create_job(kind: str) -> Job:
+    """Insert a new pending job row."""
+    with Session(engine) as session:
+        job = Job(kind=kind, heartbeat_at=datetime.utcnow())
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+def _request_cancel(job_id: int) -> bool:
+    """
+    Flag an active job for cancellation by whichever worker runs it.
+    
+    Returns:
+        bool: False if the job is missing or already in a final state
+    """
+    with Session(engine) as session:
+        count = session.exec(
+            update(Job)
+            .where(Job.id == job_id)
+            .where(Job.status.in_([JOB_PENDING, JOB_RUNNING]))
+            .values(cancel_requested=True)
+        ).rowcount
+        session.commit()
+        return count > 0
+
+def _heartbeat(job_ids: list[int], stale_after: float) -> Tuple[int, list[int]]:
+    """
+    Touch the given jobs and fail active jobs nobody has touched recently.
+    
+    A job whose worker crashed or was restarted would otherwise stay
+    pending or running forever.
+    
+    Returns:
+        Tuple of the number of orphaned jobs marked failed and the IDs of
+        the given jobs whose cancellation was requested
+    """
+    now = datetime.utcnow()
+    orphaned = (
+        update(Job)
+        .where(Job.status.in_([JOB_PENDING, JOB_RUNNING]))
+        .where(func.coalesce(Job.heartbeat_at, Job.created_at) < now - timedelta(seconds=stale_after))
+        .values(status=JOB_FAILED, error="Worker stopped before the job finished", finished_at=now)
+    )
+    cancelled: list[int] = []
+    with Session(engine) as session:
+        if job_ids:
+            session.exec(update(Job).where(Job.id.in_(job_ids)).values(heartbeat_at=now))
+            orphaned = orphaned.where(Job.id.not_in(job_ids))
+            cancelled = list(session.exec(
+                select(Job.id).where(Job.id.in_(job_ids)).where(Job.cancel_requested)
+            ).all())
+        count = session.exec(orphaned).rowcount
+        session.commit()
+        return count, cancelled
+
+class JobContext:
+    """
+    Handle passed to a running job.
+    
+    Gives the job access to the application, progress reporting and the
+    runner's process pool for CPU-heavy work.
+    """
+    
+    def __init__(self, runner: "JobRunner", job_id: int):
+        self.runner = runner
+        self.job_id = job_id
+        
+    @property
+    def app(self) -> FastAPI:
+        """The application owning the runner."""
+        return self.runner.app
+        
+    async def report(self, progress: float, message: Optional[str] = None) -> None:
+        """
+        Record job progress.
+        
+        Args:
+            progress: Completion ratio between 0.0 and 1.0
+            message: Optional human readable status message
+        """
+        await asyncio.to_thread(
+            _update_job,
+            self.job_id,
+            progress=min(max(progress, 0.0), 1.0),
+            message=message,
+        )
+        
+    async def run_in_process(self, func: Callable, *args) -> Any:
+        """
+        Run a picklable, module-level function in the runner's process pool.
+        
+        Keeps CPU-heavy work away from the cores serving requests. Cancelling
+        the job stops waiting on the result; work already started in the pool
+        runs to completion and is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.runner.process_pool, func, *args)
+
+class JobRunner:
+    """
+    In-process background job scheduler.
+    
+    Jobs are coroutines registered under a name and run as asyncio tasks on
+    the application's event loop. Their state is persisted in the `job` table
+    so it can be inspected through the admin endpoints. A job runs on the
+    worker that submitted it; other workers cancel it through the
+    `cancel_requested` flag, which that worker checks on every heartbeat.
+    """
+    
+    def __init__(
+        self,
+        app: FastAPI,
+        max_workers: int = JOB_PROCESS_WORKERS,
+        heartbeat_interval: float = JOB_HEARTBEAT_SECONDS,
+    ):
+        """
+        Initialize the runner.
+        
+        Args:
+            app: Application the jobs operate on
+            max_workers: Size of the process pool used for CPU-heavy work
+            heartbeat_interval: Seconds between heartbeats of active jobs;
+                jobs without one for three intervals are marked failed
+        """
+        self.app = app
+        self.max_workers = max_workers
+        self.heartbeat_interval = heartbeat_interval
+        self._registry: Dict[str, JobFunction] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        # Active job ID per kind, updated without awaiting in between
+        self._active: Dict[str, int] = {}
+        self._submit_lock = asyncio.Lock()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Process pool for CPU-heavy work, created on first use."""
+        if self._process_pool is None:
+            # Forking a process that already runs threads is unsafe
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._process_pool
+        
+    @property
+    def kinds(self) -> list[str]:
+        """Names of all registered jobs."""
+        return sorted(self._registry)
+        
+    def register(self, kind: str, func: JobFunction) -> None:
+        """
+        Register a job function under a name.
+        
+        Args:
+            kind: Name used to submit the job
+            func: Coroutine function receiving a JobContext
+        """
+        self._registry[kind] = func
+        
+    async def submit(self, kind: str) -> Job:
+        """
+        Schedule a registered job.
+        
+        If a job of the same kind is already active on this worker, that job
+        is returned instead of starting a second one.
+        
+        Args:
+            kind: Name of the registered job
+            
+        Returns:
+            Job: The scheduled job
+            
+        Raises:
+            KeyError: If no job is registered under the name
+        """
+        func = self._registry[kind]
+        # Serialized so concurrent submits cannot both start the same kind
+        async with self._submit_lock:
+            job_id = self._active.get(kind)
+            if job_id is not None:
+                active = await asyncio.to_thread(self._get_job, job_id)
+                if active is not None:
+                    return active
+                    
+            job = await asyncio.to_thread(_create_job, kind)
+            task = asyncio.create_task(self._run(job.id, func), name=kind)
+            self._tasks[job.id] = task
+            self._active[kind] = job.id
+            task.add_done_callback(lambda _: self._finished(kind, job.id))
+            return job
+            
+    def _finished(self, kind: str, job_id: int) -> None:
+        """Forget a job once its task is done."""
+        self._tasks.pop(job_id, None)
+        if self._active.get(kind) == job_id:
+            del self._active[kind]
+            
+    def start(self) -> None:
+        """Start heartbeating active jobs and reconciling orphaned ones."""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            
+    async def _heartbeat_loop(self) -> None:
+        """Periodically run _heartbeat; the first pass cleans up after restarts."""
+        while True:
+            try:
+                orphaned, cancelled = await asyncio.to_thread(
+                    _heartbeat, list(self._tasks), 3 * self.heartbeat_interval
+                )
+                if orphaned:
+                    print(f"🧹 Marked {orphaned} orphaned job(s) as failed")
+                for job_id in cancelled:
+                    task = self._tasks.get(job_id)
+                    if task is not None:
+                        print(f"🛑 Cancelling job {job_id} as requested")
+                        task.cancel()
+            except Exception as exc:
+                print(f"⚠️  Job heartbeat failed: {exc}")
+            await asyncio.sleep(self.heartbeat_interval)
+            
+    async def wait(self, job_id: int) -> Optional[Job]:
+        """
+        Wait until a job active on this worker reaches a final state.
+        
+        Returns:
+            Optional[Job]: The job in its final state, None if it is unknown
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.wait([task])
+        return await asyncio.to_thread(self._load_job, job_id)
+        
+    async def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job on whichever worker runs it.
+        
+        A job running on this worker is cancelled right away; one running
+        elsewhere is flagged and stops at that worker's next heartbeat.
+        
+        Args:
+            job_id: ID of the job to cancel
+            
+        Returns:
+            bool: False if the job is not pending or running
+        """
+        task = self._tasks.get(job_id)
+        if task is None:
+            return await asyncio.to_thread(_request_cancel, job_id)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+        
+    async def _run(self, job_id: int, func: JobFunction) -> None:
+        """Run a job and record its outcome."""
+        try:
+            now = datetime.utcnow()
+            await asyncio.to_thread(
+                _update_job, job_id, status=JOB_RUNNING, started_at=now, heartbeat_at=now
+            )
+            await func(JobContext(self, job_id))
+        except asyncio.CancelledError:
+            await asyncio.to_thread(
+                _update_job, job_id, status=JOB_CANCELLED, finished_at=datetime.utcnow()
+            )
+            raise
+        except Exception as exc:
+            await asyncio.to_thread(
+                _update_job,
+                job_id,
+                status=JOB_FAILED,
+                error=f"{type(exc).__name__}: {exc}",
+                finished_at=datetime.utcnow(),
+            )
+            print(f"❌ Job {job_id} failed: {exc}")
+        else:
+            await asyncio.to_thread(
+                _update_job,
+                job_id,
+                status=JOB_SUCCEEDED,
+                progress=1.0,
+                finished_at=datetime.utcnow(),
+            )
+            
+    @staticmethod
+    def _load_job(job_id: int) -> Optional[Job]:
+        """Load a job row."""
+        with Session(engine) as session:
+            return session.get(Job, job_id)
+            
+    @staticmethod
+    def _get_job(job_id: int) -> Optional[Job]:
+        """Load a job row if it is not in a final state."""
+        with Session(engine) as session:
+            job = session.get(Job, job_id)
+            if job is None or job.status in JOB_FINAL_STATES:
+                return None
+            return job
+            
+    async def shutdown(self) -> None:
+        """Cancel active jobs and stop the process pool."""
+        tasks = list(self._tasks.values())
+        if self._heartbeat_task is not None:
+            tasks.append(self._heartbeat_task)
+            self._heartbeat_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+def _load_documents(shard_only: bool = False) -> tuple[list[int], list[str], list[str]]:
+    """
+    Load the ID, TF-IDF text and duplicate-detection text of books.
+    
+    Args:
+        shard_only: Load only the books this shard owns, filtered in SQL
+    """
+    # Only the columns the documents use, as plain rows rather than ORM objects
+    query = select(Book.id, Book.title, Book.author, Book.description, Book.genres)
+    if shard_only:
+        query = query.where(shard_filter(Book.id))
+    with Session(engine) as session:
+        books = session.exec(query.order_by(Book.id)).all()
+        return (
+            [book.id for book in books],
+            [book_document(book) for book in books],
+            [dedup_document(book) for book in books],
+        )
+
+def _sample_documents(sample_size: int) -> list[str]:
+    """TF-IDF text of a random sample of all books."""
+    query = select(Book.title, Book.description, Book.genres).order_by(func.random()).limit(sample_size)
+    with Session(engine) as session:
+        return [book_document(book) for book in session.exec(query).all()]
+
+def _load_vectorizer() -> Optional[bytes]:
+    """The pickled vectorizer shared by the shards, None if none was fitted yet."""
+    with Session(engine) as session:
+        row = session.get(RecommenderVectorizer, SHARD_VECTORIZER)
+        return None if row is None else row.vectorizer
+
+def _store_vectorizer(vectorizer: bytes, book_count: int, replace: bool) -> Optional[bytes]:
+    """
+    Store the vectorizer shared by the shards.
+    
+    Unless `replace` is set, the first shard to store one wins, so shards
+    starting together still end up with the same vectorizer.
+    
+    Returns:
+        None if this vectorizer was stored, otherwise the pickled vectorizer
+        another shard stored first
+    """
+    with Session(engine) as session:
+        row = session.get(RecommenderVectorizer, SHARD_VECTORIZER)
+        if row is not None and not replace:
+            return row.vectorizer
+        if row is None:
+            row = RecommenderVectorizer(name=SHARD_VECTORIZER, vectorizer=vectorizer, book_count=book_count)
+        else:
+            row.vectorizer, row.book_count, row.fitted_at = vectorizer, book_count, datetime.utcnow()
+        session.add(row)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another shard inserted its vectorizer since we looked
+            session.rollback()
+            return session.get(RecommenderVectorizer, SHARD_VECTORIZER).vectorizer
+        return None
+
+async def _shared_vectorizer(ctx: JobContext, refit: bool):
+    """
+    Load the vectorizer shared by the shards, fitting it first if needed.
+    
+    It is fitted on a sample of the whole catalogue rather than on one
+    shard's books, so every shard weighs terms the same way and their
+    scores can be merged.
+    
+    Args:
+        ctx: Context of the running job
+        refit: Fit and store a new vectorizer even if one exists
+        
+    Returns:
+        The fitted vectorizer, None if no book contains a usable term
+    """
+    if not refit:
+        stored = await asyncio.to_thread(_load_vectorizer)
+        if stored is not None:
+            return await asyncio.to_thread(pickle.loads, stored)
+            
+    await ctx.report(0.1, "Sampling books for the shared vectorizer")
+    documents = await asyncio.to_thread(_sample_documents, SHARD_VECTORIZER_SAMPLE_SIZE)
+    await ctx.report(0.2, f"Fitting the shared vectorizer over {len(documents)} books")
+    vectorizer = await ctx.run_in_process(fit_vectorizer, documents)
+    if vectorizer is None:
+        return None
+    pickled = await asyncio.to_thread(pickle.dumps, vectorizer)
+    stored = await asyncio.to_thread(_store_vectorizer, pickled, len(documents), refit)
+    return vectorizer if stored is None else await asyncio.to_thread(pickle.loads, stored)
+
+async def rebuild_index(ctx: JobContext, refit: bool = False) -> None:
+    """
+    Refit the TF-IDF recommender index and the near-duplicate index.
+    
+    Args:
+        ctx: Context of the running job
+        refit: On a shard, also replace the vectorizer shared by all shards
+    """
+    recommender = ctx.app.state.recommender
+    # Shard processes keep no near-duplicate index
+    duplicates = ctx.app.state.duplicates
+    # Changes arriving from here on are replayed onto the new indexes, which
+    # would otherwise be installed from documents read before them
+    recommender.begin_rebuild()
+    if duplicates is not None:
+        duplicates.begin_load()
+    try:
+        await _rebuild_index(ctx, recommender, duplicates, refit)
+    finally:
+        recommender.end_rebuild()
+        if duplicates is not None:
+            duplicates.end_load()
+
+async def refit_vectorizer(ctx: JobContext) -> None:
+    """
+    Replace the vectorizer shared by the shards, then rebuild this shard.
+    
+    Other shards keep their old vectorizer until they rebuild; their scores
+    are not comparable with this shard's until then.
+    """
+    await rebuild_index(ctx, refit=True)
+
+async def _rebuild_index(ctx: JobContext, recommender, duplicates, refit: bool) -> None:
+    """Body of rebuild_index, run while changes are being logged."""
+    await ctx.report(0.0, "Loading catalogue")
+    # A shard reads only the books it owns
+    book_ids, documents, dedup_documents = await asyncio.to_thread(_load_documents, SHARD_ONLY)
+    if not book_ids:
+        await ctx.report(1.0, "Catalogue is empty")
+        return
+        
+    index = None
+    if SHARD_ONLY:
+        vectorizer = await _shared_vectorizer(ctx, refit)
+        if vectorizer is not None:
+            await ctx.report(0.4, f"Vectorizing {len(book_ids)} books")
+            index = (vectorizer, await ctx.run_in_process(vectorize, vectorizer, documents), book_ids)
+    # A coordinator fits nothing and leaves scoring to the shards
+    elif recommender.shards is None:
+        await ctx.report(0.2, f"Fitting TF-IDF over {len(book_ids)} books")
+        fitted = await ctx.run_in_process(build_tfidf_index, documents)
+        if fitted is not None:
+            index = (*fitted, book_ids)
+            
+    signatures = None
+    if duplicates is not None:
+        await ctx.report(0.6, f"Computing MinHash signatures for {len(book_ids)} books")
+        signatures = await ctx.run_in_process(minhash_signatures, dedup_documents)
+        
+    await ctx.report(0.9, "Installing indexes")
+    if index is not None:
+        await recommender.load_index(*index)
+    if duplicates is not None:
+        await asyncio.to_thread(duplicates.load, book_ids, signatures)
+    await ctx.report(1.0, f"Indexed {len(book_ids)} books")
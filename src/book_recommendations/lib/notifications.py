@@ -0,0 +1,175 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict
+import asyncpg
+from fastapi import FastAPI
+from sqlalchemy.engine import make_url
+from sqlmodel import Session, select
+from .database import engine
+from .config import DB_URL
+from ..models.Book import Book
+
+BOOK_CHANNEL = "book_changes"
+
+def _asyncpg_dsn(url: str) -> str:
+    """Turn a SQLAlchemy URL such as postgresql+psycopg2://... into a libpq DSN."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+def _load_books(book_ids: list[int]) -> list[Book]:
+    """Load the current version of the given books."""
+    with Session(engine) as session:
+        return session.exec(select(Book).where(Book.id.in_(book_ids))).all()
+
+class BookChangeListener:
+    """
+    Applies book changes committed by any worker to this worker's state.
+    
+    A trigger (see the notify_book_changes migration) publishes every
+    insert, update and delete on the `book_changes` channel. The listener
+    holds a dedicated asyncpg connection that LISTENs on it, batches the
+    events and updates the in-memory catalogue, near-duplicate index and
+    recommender index. Shard processes have only the recommender index.
+    """
+    
+    def __init__(self, app: FastAPI, debounce: float = 0.2, retry_delay: float = 5.0):
+        """
+        Initialize the listener.
+        
+        Args:
+            app: Application whose state is kept in sync
+            debounce: Seconds to wait for more events before applying a batch
+            retry_delay: Seconds between reconnection attempts
+        """
+        self.app = app
+        self.debounce = debounce
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # Set while LISTEN is registered on a live connection
+        self._listening = asyncio.Event()
+        self._task = None
+        self._rebuild_task = None
+        
+    async def start(self) -> None:
+        """
+        Start listening in a background task, unless already started.
+        
+        Returns once LISTEN is registered, so state loaded afterwards cannot
+        miss a change; keeps waiting while the database is unreachable.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        await self._listening.wait()
+        
+    async def stop(self) -> None:
+        """Stop listening and close the connection."""
+        for task in (self._task, self._rebuild_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._task = self._rebuild_task = None
+        
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        """asyncpg callback; runs on the event loop."""
+        self._queue.put_nowait(payload)
+        
+    async def _run(self) -> None:
+        """Keep a LISTEN connection open, reconnecting after failures."""
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(_asyncpg_dsn(DB_URL))
+                await connection.add_listener(BOOK_CHANNEL, self._on_notification)
+                self._listening.set()
+                # Events sent while disconnected are lost, and so are any sent
+                # before the first connect if something was loaded meanwhile
+                catalogue = self.app.state.catalogue
+                if connected_before or (catalogue is not None and catalogue.loaded):
+                    await self._resync()
+                connected_before = True
+                await self._consume(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️  Book change listener disconnected: {exc}")
+            finally:
+                self._listening.clear()
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.retry_delay)
+            
+    async def _consume(self, connection) -> None:
+        """Apply queued events in batches until the connection drops."""
+        while not connection.is_closed():
+            try:
+                payload = await asyncio.wait_for(self._queue.get(), timeout=self.retry_delay)
+            except asyncio.TimeoutError:
+                continue
+            await asyncio.sleep(self.debounce)
+            
+            # Only the last operation per book matters
+            changes: Dict[int, str] = {}
+            while True:
+                event = json.loads(payload)
+                changes[int(event["id"])] = event["op"]
+                if self._queue.empty():
+                    break
+                payload = self._queue.get_nowait()
+            await self.apply(changes)
+            
+    async def apply(self, changes: Dict[int, str]) -> None:
+        """
+        Apply a batch of changes to the catalogue and recommender index.
+        
+        Args:
+            changes: Operation ("INSERT", "UPDATE" or "DELETE") per book ID
+        """
+        deleted_ids = [book_id for book_id, op in changes.items() if op == "DELETE"]
+        upserted_ids = [book_id for book_id, op in changes.items() if op != "DELETE"]
+        books = await asyncio.to_thread(_load_books, upserted_ids) if upserted_ids else []
+        # A book may have been deleted again after its insert or update
+        found = {book.id for book in books}
+        deleted_ids.extend(book_id for book_id in upserted_ids if book_id not in found)
+        
+        catalogue = self.app.state.catalogue
+        duplicates = self.app.state.duplicates
+        
+        def update_catalogue():
+            for book in books:
+                catalogue.upsert(book)
+                duplicates.upsert(book)
+            for book_id in deleted_ids:
+                catalogue.discard(book_id)
+                duplicates.discard(book_id)
+                
+        if catalogue is not None:
+            await asyncio.to_thread(update_catalogue)
+        await self.app.state.recommender.update_books(books, deleted_ids)
+        
+    async def _resync(self) -> None:
+        """Rebuild local state from scratch after missing notifications."""
+        print("🔄 Book change listener reconnected, resynchronising")
+        reconnected_at = datetime.utcnow()
+        
+        def reload():
+            with Session(engine) as session:
+                self.app.state.catalogue.load(session)
+                
+        if self.app.state.catalogue is not None:
+            await asyncio.to_thread(reload)
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild_since(reconnected_at))
+            
+    async def _rebuild_since(self, reconnected_at: datetime) -> None:
+        """
+        Make sure an index rebuild starts after the reconnect.
+        
+        A rebuild already running may have read its documents before the
+        missed changes, so it is followed by a fresh one.
+        """
+        runner = self.app.state.jobs
+        job = await runner.submit("rebuild_index")
+        if job.created_at < reconnected_at:
+            await runner.wait(job.id)
+            await runner.submit("rebuild_index")
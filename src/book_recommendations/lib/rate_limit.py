@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import text
+from .database import engine
+from .config import (
+    RATE_LIMIT_STANDARD_PER_MINUTE,
+    RATE_LIMIT_AI_PER_MINUTE,
+    RATE_LIMIT_STORE_COOLDOWN_SECONDS,
+)
+from .security import get_api_key
+
+# Requests per minute for each route class, as documented in the API description
+RATE_LIMITS = {
+    "standard": RATE_LIMIT_STANDARD_PER_MINUTE,
+    "ai": RATE_LIMIT_AI_PER_MINUTE,
+}
+
+class LocalBucketStore:
+    """
+    Token buckets held in process memory.
+    
+    Each bucket is an immutable (tokens, updated_at, full_at) tuple that is
+    replaced on every request. All calls run on the event loop without
+    awaiting in between, so no lock is needed.
+    """
+    
+    def __init__(self, max_buckets: int = 10_000):
+        """
+        Initialize the store.
+        
+        Args:
+            max_buckets: Bucket count above which idle, full buckets are dropped
+        """
+        self.max_buckets = max_buckets
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        """
+        Take one token from a bucket.
+        
+        Args:
+            key: Bucket key
+            capacity: Bucket size, i.e. the allowed burst
+            rate: Refill rate in tokens per second
+            
+        Returns:
+            float: 0 if the request is admitted, otherwise seconds until a
+                token becomes available
+        """
+        now = time.monotonic()
+        tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        if len(self._buckets) > self.max_buckets:
+            self._prune(now)
+        return 0.0 if allowed else (1 - tokens) / rate
+        
+    def _prune(self, now: float) -> None:
+        """Drop buckets that have refilled completely; they equal a fresh bucket."""
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[2] > now
+        }
+
+class PostgresBucketStore:
+    """
+    Token buckets shared by all workers through the rate_limit_bucket table.
+    
+    Every request is one atomic upsert evaluated against the database
+    clock, so concurrent workers and hosts never double-spend a token.
+    """
+    
+    _TAKE = text("""
+        INSERT INTO rate_limit_bucket AS b (key, tokens, updated_at, allowed)
+        VALUES (:key, :capacity - 1, extract(epoch FROM clock_timestamp()), true)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(:capacity, b.tokens + (EXCLUDED.updated_at - b.updated_at) * :rate)
+                - CASE WHEN LEAST(:capacity, b.tokens + (EXCLUDED.updated_at - b.updated_at) * :rate) >= 1
+                       THEN 1 ELSE 0 END,
+            allowed = LEAST(:capacity, b.tokens + (EXCLUDED.updated_at - b.updated_at) * :rate) >= 1,
+            updated_at = EXCLUDED.updated_at
+        RETURNING tokens, allowed
+    """)
+    
+    def _take(self, key: str, capacity: float, rate: float) -> float:
+        with engine.begin() as connection:
+            tokens, allowed = connection.execute(
+                self._TAKE, {"key": key, "capacity": capacity, "rate": rate}
+            ).one()
+        return 0.0 if allowed else (1 - tokens) / rate
+        
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take one token from a bucket. See LocalBucketStore.take."""
+        return await asyncio.to_thread(self._take, key, capacity, rate)
+
+class RateLimiter:
+    """
+    Per-API-key, per-route-class token bucket rate limiter.
+    
+    The app accepts a single API key (X_API_KEY), so in practice there is
+    one bucket per route class: shared by all clients, and per worker
+    unless the Postgres store is used.
+    
+    The shared Postgres store is optional; if it fails, the limiter falls
+    back to the local store for a cooldown rather than rejecting traffic
+    or paying for a failing connection on every request.
+    """
+    
+    def __init__(
+        self,
+        store=None,
+        limits: Dict[str, int] = RATE_LIMITS,
+        cooldown: float = RATE_LIMIT_STORE_COOLDOWN_SECONDS,
+    ):
+        """
+        Initialize the limiter.
+        
+        Args:
+            store: Bucket store, defaults to a LocalBucketStore
+            limits: Requests per minute for each route class
+            cooldown: Seconds to skip the shared store after it fails
+        """
+        self.local = LocalBucketStore()
+        self.store = store or self.local
+        self.limits = limits
+        self.cooldown = cooldown
+        self._store_retry_at = 0.0
+        
+    async def hit(self, api_key: str, route_class: str) -> float:
+        """
+        Count a request against the caller's bucket.
+        
+        Returns:
+            float: 0 if admitted, otherwise seconds the caller should wait
+        """
+        capacity = self.limits[route_class]
+        rate = capacity / 60
+        # Keys are hashed so raw API keys never reach the database
+        digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32]
+        key = f"{route_class}:{digest}"
+        if self.store is not self.local and time.monotonic() >= self._store_retry_at:
+            try:
+                return await self.store.take(key, capacity, rate)
+            except Exception as exc:
+                self._store_retry_at = time.monotonic() + self.cooldown
+                print(
+                    f"⚠️  Shared rate limit store failed, using local buckets "
+                    f"for {self.cooldown:.0f}s: {exc}"
+                )
+        return await self.local.take(key, capacity, rate)
+
+def rate_limited(route_class: str):
+    """
+    Build a dependency that authenticates the API key and enforces the
+    rate limit of the given route class.
+    
+    Args:
+        route_class: Key into RATE_LIMITS, e.g. "standard" or "ai"
+        
+    Returns:
+        FastAPI dependency resolving to the validated API key
+    """
+    async def dependency(request: Request, api_key: str = Depends(get_api_key)) -> str:
+        retry_after = await request.app.state.rate_limiter.hit(api_key, route_class)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        return api_key
+        
+    return dependency
+
+standard_rate_limit = rate_limited("standard")
+ai_rate_limit = rate_limited("ai")
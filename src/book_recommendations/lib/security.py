@@ -1,10 +1,13 @@
+import secrets
 from fastapi import Security, HTTPException, status
 from fastapi.security import APIKeyHeader
-from .config import API_KEY
+from .config import API_KEY, SHARD_TOKEN
 
 API_KEY_NAME = "X-API-Key"
+SHARD_TOKEN_NAME = "X-Shard-Token"
 
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=True)
+shard_token_header = APIKeyHeader(name=SHARD_TOKEN_NAME, auto_error=True)
 
 async def get_api_key(api_key_header: str = Security(api_key_header)) -> str:
     """
@@ -24,4 +27,25 @@ async def get_api_key(api_key_header: str = Security(api_key_header)) -> str:
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Could not validate API key"
-    )
\ No newline at end of file
+    )
+
+async def get_shard_token(shard_token_header: str = Security(shard_token_header)) -> str:
+    """
+    Validate the coordinator's token from the X-Shard-Token header.
+    
+    Args:
+        shard_token_header: The token from the request header
+        
+    Returns:
+        str: The validated token
+        
+    Raises:
+        HTTPException: If the token is invalid or missing, or no
+            SHARD_TOKEN is configured
+    """
+    if SHARD_TOKEN and secrets.compare_digest(shard_token_header, SHARD_TOKEN):
+        return shard_token_header
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Could not validate shard token"
+    )
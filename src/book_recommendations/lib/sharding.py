@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import and_, true
+from .config import (
+    SHARD_COUNT,
+    SHARD_ID,
+    SHARD_PARTITION,
+    SHARD_RANGE_SIZE,
+    SHARD_TIMEOUT_SECONDS,
+    SHARD_TOKEN,
+    SHARD_URLS,
+)
+from .security import SHARD_TOKEN_NAME
+
+SHARD_SEARCH_PATH = "/internal/shard/search"
+# A shard process only scores its own books for coordinators, so it keeps
+# no catalogue or near-duplicate index
+SHARD_ONLY = SHARD_COUNT > 1 and not SHARD_URLS
+
+class ShardsUnavailable(Exception):
+    """Raised when no shard answered a scatter-gather query."""
+
+def owns_book(
+    book_id: int,
+    shard_id: int = SHARD_ID,
+    shard_count: int = SHARD_COUNT,
+    partition: str = SHARD_PARTITION,
+    range_size: int = SHARD_RANGE_SIZE,
+) -> bool:
+    """
+    Whether a book belongs to a shard of the recommender index.
+    
+    Args:
+        book_id: ID of the book
+        shard_id: Shard to test, defaults to this process's shard
+        shard_count: Total number of shards; 1 means unsharded
+        partition: "hash" spreads IDs round-robin, "range" assigns blocks
+            of range_size consecutive IDs, the last shard taking the rest
+        range_size: IDs per shard in range partitioning
+        
+    Returns:
+        bool: True if the shard indexes this book
+    """
+    if shard_count <= 1:
+        return True
+    if partition == "range":
+        return min(book_id // range_size, shard_count - 1) == shard_id
+    return book_id % shard_count == shard_id
+
+def shard_filter(
+    column,
+    shard_id: int = SHARD_ID,
+    shard_count: int = SHARD_COUNT,
+    partition: str = SHARD_PARTITION,
+    range_size: int = SHARD_RANGE_SIZE,
+):
+    """
+    SQL condition selecting the books of a shard; the query form of `owns_book`.
+    
+    Args:
+        column: Book ID column to filter on
+        shard_id: Shard to select, defaults to this process's shard
+        shard_count: Total number of shards; 1 selects every book
+        partition: "hash" or "range", as in `owns_book`
+        range_size: IDs per shard in range partitioning
+        
+    Returns:
+        SQLAlchemy boolean expression for a WHERE clause
+    """
+    if shard_count <= 1:
+        return true()
+    if partition == "range":
+        conditions = []
+        if shard_id > 0:
+            conditions.append(column >= shard_id * range_size)
+        if shard_id < shard_count - 1:
+            conditions.append(column < (shard_id + 1) * range_size)
+        return and_(true(), *conditions)
+    return column % shard_count == shard_id
+
+class ShardCoordinator:
+    """
+    Scatter-gather client for a sharded recommender index.
+    
+    Every query is sent to all shards concurrently over one pooled HTTP
+    client; the per-shard top-k lists are merged with a heap. Shards that
+    fail or miss the deadline are skipped, so results degrade to the
+    shards that answered instead of failing the request.
+    """
+    
+    def __init__(self, urls: Sequence[str], timeout: float = SHARD_TIMEOUT_SECONDS):
+        """
+        Initialize the coordinator.
+        
+        Args:
+            urls: Base URLs of the shard processes
+            timeout: Seconds to wait for each shard
+            
+        Raises:
+            ValueError: If SHARD_TOKEN is not configured
+        """
+        if not SHARD_TOKEN:
+            raise ValueError("SHARD_TOKEN must be set to query recommender shards")
+            
+        # Imported here; only coordinator processes need an HTTP client
+        import httpx
+        
+        self.urls = list(urls)
+        self.timeout = timeout
+        self._client = httpx.AsyncClient(
+            headers={SHARD_TOKEN_NAME: SHARD_TOKEN},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=32 * len(self.urls), max_keepalive_connections=8 * len(self.urls)
+            ),
+        )
+        
+    async def _query(self, url: str, payload: dict) -> List[Tuple[int, float]]:
+        """Ask one shard for its top matches."""
+        response = await self._client.post(f"{url}{SHARD_SEARCH_PATH}", json=payload)
+        response.raise_for_status()
+        return [(match["book_id"], match["score"]) for match in response.json()["results"]]
+        
+    async def search(
+        self, document: str, limit: int, exclude_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank books across all shards by similarity to a document.
+        
+        Args:
+            document: Text representation of the source book
+            limit: Maximum number of results
+            exclude_id: Book to leave out, usually the source book
+            
+        Returns:
+            List of (book_id, score) pairs, best first
+            
+        Raises:
+            ShardsUnavailable: If every shard failed or timed out
+        """
+        payload = {"document": document, "limit": limit, "exclude_id": exclude_id}
+        responses = await asyncio.gather(
+            *(asyncio.wait_for(self._query(url, payload), self.timeout) for url in self.urls),
+            return_exceptions=True,
+        )
+        
+        answered = []
+        for url, response in zip(self.urls, responses):
+            if isinstance(response, Exception):
+                print(f"⚠️  Shard {url} did not answer: {response!r}")
+                continue
+            answered.append(response)
+        if not answered:
+            raise ShardsUnavailable()
+        return heapq.nlargest(limit, itertools.chain.from_iterable(answered), key=lambda match: match[1])
+        
+    async def close(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one shared computation.
+    
+    The first caller for a key starts the computation; callers arriving
+    while it is still in flight await the same result (or exception).
+    Nothing is cached once the computation finishes.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        
+    def __len__(self) -> int:
+        return len(self._calls)
+        
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func once per key among concurrent callers.
+        
+        The computation runs in its own task, so a caller that is cancelled
+        (e.g. the client disconnected) does not cancel it for the others.
+        
+        Args:
+            key: Identifies identical calls, e.g. (route, book_id, limit)
+            func: Zero-argument coroutine function computing the result
+            
+        Returns:
+            The result of the shared computation
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+        
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished computation so the next call starts afresh."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
@@ -1,6 +1,7 @@
 from .core.app import BookRecommendationsApp
-from .routes import books, recommendations
+from .routes import books, recommendations, admin, health, shards
 from .lib.scalar import router as scalar_router
+from .lib.sharding import SHARD_ONLY
 
 app = BookRecommendationsApp(
     title="Book Recommendations API",
@@ -35,6 +36,10 @@ app = BookRecommendationsApp(
     * Standard endpoints: 100 requests per minute
     * AI recommendation endpoints: 10 requests per minute
     
+    Limits apply per API key. Requests over the limit receive `429 Too Many Requests`
+    with a `Retry-After` header giving the seconds to wait. The service accepts a
+    single API key, so the limits are effectively shared by all clients.
+    
     ## Errors
     
     The API uses standard HTTP status codes and includes detailed error messages
@@ -59,12 +64,25 @@ app = BookRecommendationsApp(
             "name": "recommendations",
             "description": "Book recommendation endpoints using traditional and AI methods.",
         },
+        {
+            "name": "admin",
+            "description": "Background job management, e.g. recommender index rebuilds.",
+        },
+        {
+            "name": "health",
+            "description": "Liveness and readiness probes.",
+        },
     ],
     # Use separate schemas for input/output for better OpenAPI documentation
     separate_input_output_schemas=True,
 )
 
 # Include routers
-app.include_router(books.router)
-app.include_router(recommendations.router)
+# Shard processes have no catalogue; clients talk to the coordinators
+if not SHARD_ONLY:
+    app.include_router(books.router)
+    app.include_router(recommendations.router)
+app.include_router(admin.router)
+app.include_router(health.router)
+app.include_router(shards.router)
 app.include_router(scalar_router)
\ No newline at end of file
@@ -34,6 +34,7 @@ class BookBase(SQLModel):
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
+        index=True,
         description="Timestamp when the book was last updated"
     )
 
@@ -0,0 +1,73 @@
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from datetime import datetime
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+JOB_FINAL_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+class JobBase(SQLModel):
+    """
+    Base Job model with common attributes.
+    
+    Attributes:
+        kind: Name of the registered job, e.g. "rebuild_index"
+        status: One of pending, running, succeeded, failed or cancelled
+        progress: Completion ratio between 0.0 and 1.0
+        message: Last progress message reported by the job
+        error: Error message if the job failed
+        created_at: Timestamp when the job was submitted
+        started_at: Timestamp when the job started running
+        finished_at: Timestamp when the job reached a final state
+        heartbeat_at: Last time the worker running the job reported in
+        cancel_requested: Set to ask the worker running the job to cancel it
+    """
+    kind: str = Field(description="Name of the registered job", index=True)
+    status: str = Field(default=JOB_PENDING, description="Current job status", index=True)
+    progress: float = Field(default=0.0, description="Completion ratio between 0.0 and 1.0")
+    message: Optional[str] = Field(default=None, description="Last progress message")
+    error: Optional[str] = Field(default=None, description="Error message if the job failed")
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        description="Timestamp when the job was submitted"
+    )
+    started_at: Optional[datetime] = Field(
+        default=None,
+        description="Timestamp when the job started running"
+    )
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="Timestamp when the job reached a final state"
+    )
+    heartbeat_at: Optional[datetime] = Field(
+        default=None,
+        description="Last time the worker running the job reported in"
+    )
+    cancel_requested: bool = Field(
+        default=False,
+        description="Set to ask the worker running the job to cancel it"
+    )
+
+class Job(JobBase, table=True):
+    """
+    SQLModel Job model for database operations.
+    
+    Extends JobBase and adds:
+        id: Unique identifier
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+class JobRead(JobBase):
+    """
+    Pydantic model for reading job data.
+    
+    Extends JobBase and adds:
+        id: The job's unique identifier
+        
+    Used for serializing job data in responses.
+    """
+    id: int = Field(description="The job's unique identifier")
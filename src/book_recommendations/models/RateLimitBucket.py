@@ -0,0 +1,21 @@
+from sqlmodel import Field, SQLModel
+
+class RateLimitBucket(SQLModel, table=True):
+    """
+    SQLModel table backing the shared rate limiter.
+    
+    Only used when RATE_LIMIT_BACKEND is "postgres"; rows are updated with a
+    single atomic upsert per request (see lib/rate_limit.py).
+    
+    Attributes:
+        key: Bucket key, a hash of the API key plus the route class
+        tokens: Tokens left after the last request
+        updated_at: Database clock, in epoch seconds, of the last request
+        allowed: Whether the last request was admitted
+    """
+    __tablename__ = "rate_limit_bucket"
+    
+    key: str = Field(primary_key=True, description="Bucket key")
+    tokens: float = Field(description="Tokens left after the last request")
+    updated_at: float = Field(description="Epoch seconds of the last request")
+    allowed: bool = Field(default=True, description="Whether the last request was admitted")
@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field, SQLModel
+
+class RecommenderVectorizer(SQLModel, table=True):
+    """
+    SQLModel table holding the vectorizer shared by recommender shards.
+    
+    Shards score only their own books, but must turn documents into vectors
+    the same way for their scores to be comparable. One vectorizer is fitted
+    on a sample of the whole catalogue and stored here (see lib/jobs.py);
+    every shard loads it when it rebuilds.
+    
+    Attributes:
+        name: Which vectorizer this is; "shards" for the sharded index
+        vectorizer: Pickled fitted vectorizer
+        book_count: Number of books it was fitted on
+        fitted_at: Timestamp when it was fitted
+    """
+    __tablename__ = "recommender_vectorizer"
+    
+    name: str = Field(primary_key=True, description="Which vectorizer this is")
+    vectorizer: bytes = Field(sa_column=Column(LargeBinary, nullable=False), description="Pickled vectorizer")
+    book_count: int = Field(description="Number of books it was fitted on")
+    fitted_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when it was fitted")
@@ -0,0 +1,40 @@
+from typing import List, Optional
+from sqlmodel import Field, SQLModel
+
+# Most matches a shard returns for one query
+SHARD_MAX_LIMIT = 1000
+
+class ShardSearchRequest(SQLModel):
+    """
+    Query sent by the coordinator to each recommender shard.
+    
+    Attributes:
+        document: Text representation of the source book
+        limit: Maximum number of matches to return
+        exclude_id: Book to leave out of the matches, usually the source book
+    """
+    document: str = Field(description="Text representation of the source book")
+    limit: int = Field(default=5, ge=1, le=SHARD_MAX_LIMIT, description="Maximum number of matches")
+    exclude_id: Optional[int] = Field(default=None, description="Book to leave out")
+
+class ShardMatch(SQLModel):
+    """
+    A scored book from one shard.
+    
+    Attributes:
+        book_id: ID of the matching book
+        score: Cosine similarity to the query
+    """
+    book_id: int = Field(description="ID of the matching book")
+    score: float = Field(description="Cosine similarity to the query")
+
+class ShardSearchResponse(SQLModel):
+    """
+    Top matches of one shard, best first.
+    
+    Attributes:
+        shard_id: Shard that answered
+        results: Matches, best first
+    """
+    shard_id: int = Field(description="Shard that answered")
+    results: List[ShardMatch] = Field(default_factory=list, description="Matches, best first")
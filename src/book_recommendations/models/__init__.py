@@ -1,6 +1,10 @@
 from .Book import Book, BookBase, BookCreate, BookRead, BookUpdate
 from .User import User, UserBase, UserCreate, UserRead
 from .UserBook import UserBook
+from .Job import Job, JobBase, JobRead
+from .RateLimitBucket import RateLimitBucket
+from .RecommenderVectorizer import RecommenderVectorizer
+from .Shard import ShardSearchRequest, ShardMatch, ShardSearchResponse
 
 # Export all models
 __all__ = [
@@ -17,6 +21,17 @@ __all__ = [
     "UserRead",
     # UserBook model
     "UserBook",
+    # Job models
+    "Job",
+    "JobBase",
+    "JobRead",
+    # Rate limiting
+    "RateLimitBucket",
+    # Sharded recommender
+    "RecommenderVectorizer",
+    "ShardSearchRequest",
+    "ShardMatch",
+    "ShardSearchResponse",
 ]
 
 # For Alembic migrations
@@ -1,8 +1,14 @@
 from .books import router as books_router
 from .recommendations import router as recommendations_router
+from .admin import router as admin_router
+from .health import router as health_router
+from .shards import router as shards_router
 
 __all__ = [
     "books_router",
     "recommendations_router",
+    "admin_router",
+    "health_router",
+    "shards_router",
     "docs_router",
 ]
@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlmodel import Session, select
+from typing import List, Any
+from ..models.Job import Job, JobRead, JOB_FINAL_STATES
+from ..lib.dependencies import get_session
+from ..lib.rate_limit import standard_rate_limit
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+@router.get("/jobs", response_model=List[JobRead])
+async def read_jobs(
+    *,
+    session: Session = Depends(get_session),
+    skip: int = 0,
+    limit: int = 50,
+    api_key: str = Depends(standard_rate_limit)
+) -> Any:
+    """
+    Get background jobs, most recent first.
+    
+    Args:
+        session: Database session
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        api_key: API key for authentication
+        
+    Returns:
+        List[JobRead]: List of jobs
+        
+    Raises:
+        HTTPException: If authentication fails
+    """
+    jobs = session.exec(
+        select(Job).order_by(Job.created_at.desc()).offset(skip).limit(limit)
+    ).all()
+    return jobs
+
+@router.get("/jobs/{job_id}", response_model=JobRead)
+async def read_job(
+    *,
+    session: Session = Depends(get_session),
+    job_id: int,
+    api_key: str = Depends(standard_rate_limit)
+) -> Any:
+    """
+    Get the status and progress of a background job.
+    
+    Args:
+        session: Database session
+        job_id: ID of the job to retrieve
+        api_key: API key for authentication
+        
+    Returns:
+        JobRead: Job data
+        
+    Raises:
+        HTTPException: If job is not found or authentication fails
+    """
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/{kind}", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    *,
+    request: Request,
+    kind: str,
+    api_key: str = Depends(standard_rate_limit)
+) -> Any:
+    """
+    Schedule a background job, e.g. `rebuild_index`.
+    
+    The job runs on the worker that receives the request; `rebuild_index`
+    therefore refreshes that worker's indexes only. Other workers pick up
+    individual book changes through LISTEN/NOTIFY and refit at startup.
+    
+    Args:
+        request: Incoming request, used to reach the job runner
+        kind: Name of the registered job
+        api_key: API key for authentication
+        
+    Returns:
+        JobRead: The scheduled job, or the already active job of that kind
+        
+    Raises:
+        HTTPException: If the job kind is unknown or authentication fails
+    """
+    runner = request.app.state.jobs
+    if kind not in runner.kinds:
+        raise HTTPException(status_code=404, detail="Unknown job kind")
+    return await runner.submit(kind)
+
+@router.delete("/jobs/{job_id}", response_model=dict[str, bool])
+async def cancel_job(
+    *,
+    request: Request,
+    session: Session = Depends(get_session),
+    job_id: int,
+    api_key: str = Depends(standard_rate_limit)
+) -> Any:
+    """
+    Cancel a pending or running background job.
+    
+    A job running on another worker is flagged in the database and stops
+    at that worker's next heartbeat, within JOB_HEARTBEAT_SECONDS.
+    
+    Args:
+        request: Incoming request, used to reach the job runner
+        session: Database session
+        job_id: ID of the job to cancel
+        api_key: API key for authentication
+        
+    Returns:
+        dict[str, bool]: Success message
+        
+    Raises:
+        HTTPException: If job is not found, already finished or
+            authentication fails
+    """
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in JOB_FINAL_STATES:
+        raise HTTPException(status_code=409, detail="Job already finished")
+        
+    if not await request.app.state.jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return {"ok": True}
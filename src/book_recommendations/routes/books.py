@@ -1,26 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import Session, select
 from typing import List, Any
 from ..models.Book import Book, BookCreate, BookRead, BookUpdate
-from ..lib.dependencies import get_session
-from ..lib.security import get_api_key
+from ..lib.dependencies import get_session, get_read_session
+from ..lib.rate_limit import standard_rate_limit
+from ..lib.dedup import DEFAULT_THRESHOLD, MAX_DUPLICATES
 
 router = APIRouter(
     prefix="/books",
     tags=["books"],
 )
 
+def _index_book(app, book: Book) -> None:
+    """Reflect a written book in this worker's in-memory indexes right away."""
+    app.state.catalogue.upsert(book)
+    app.state.duplicates.upsert(book)
+
 @router.post("/", response_model=BookRead)
 async def create_book(
     *,
+    request: Request,
     session: Session = Depends(get_session),
     book: BookCreate,
-    api_key: str = Depends(get_api_key)
+    api_key: str = Depends(standard_rate_limit)
 ) -> Any:
     """
     Create a new book.
     
     Args:
+        request: Incoming request, used to reach the in-memory indexes
         session: Database session
         book: Book data to create
         api_key: API key for authentication
@@ -35,15 +45,16 @@ async def create_book(
     session.add(db_book)
     session.commit()
     session.refresh(db_book)
+    await asyncio.to_thread(_index_book, request.app, db_book)
     return db_book
 
 @router.get("/", response_model=List[BookRead])
 async def read_books(
     *,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     skip: int = 0,
     limit: int = 100,
-    api_key: str = Depends(get_api_key)
+    api_key: str = Depends(standard_rate_limit)
 ) -> Any:
     """
     Get a list of books with pagination.
@@ -66,9 +77,9 @@ async def read_books(
 @router.get("/{book_id}", response_model=BookRead)
 async def read_book(
     *,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     book_id: int,
-    api_key: str = Depends(get_api_key)
+    api_key: str = Depends(standard_rate_limit)
 ) -> Any:
     """
     Get a specific book by ID.
@@ -89,18 +100,58 @@ async def read_book(
         raise HTTPException(status_code=404, detail="Book not found")
     return book
 
+@router.get("/{book_id}/duplicates", response_model=List[BookRead])
+async def read_book_duplicates(
+    *,
+    request: Request,
+    session: Session = Depends(get_read_session),
+    book_id: int,
+    threshold: float = Query(default=DEFAULT_THRESHOLD, ge=0.0, le=1.0),
+    limit: int = Query(default=20, ge=1, le=MAX_DUPLICATES),
+    api_key: str = Depends(standard_rate_limit)
+) -> Any:
+    """
+    Get likely other editions or reprints of a specific book.
+    
+    Near-duplicates are found through MinHash signatures of title, author
+    and description, so only a handful of candidates are ever compared.
+    
+    Args:
+        request: Incoming request, used to reach the in-memory indexes
+        session: Database session
+        book_id: ID of the book to find duplicates of
+        threshold: Minimum estimated Jaccard similarity (0-1)
+        limit: Maximum number of records to return
+        api_key: API key for authentication
+        
+    Returns:
+        List[BookRead]: Near-duplicate books, most similar first
+        
+    Raises:
+        HTTPException: If book is not found or authentication fails
+    """
+    book = session.get(Book, book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+        
+    matches = request.app.state.duplicates.find(book, threshold, limit)
+    ids = [match_id for match_id, _ in matches]
+    return request.app.state.recommender.hydrate(ids, session)
+
 @router.patch("/{book_id}", response_model=BookRead)
 async def update_book(
     *,
+    request: Request,
     session: Session = Depends(get_session),
     book_id: int,
     book: BookUpdate,
-    api_key: str = Depends(get_api_key)
+    api_key: str = Depends(standard_rate_limit)
 ) -> Any:
     """
     Update a specific book.
     
     Args:
+        request: Incoming request, used to reach the in-memory indexes
         session: Database session
         book_id: ID of the book to update
         book: Updated book data
@@ -115,27 +166,32 @@ async def update_book(
     db_book = session.get(Book, book_id)
     if not db_book:
         raise HTTPException(status_code=404, detail="Book not found")
-    
+        
     book_data = book.dict(exclude_unset=True)
     for key, value in book_data.items():
         setattr(db_book, key, value)
+    # Other workers learn of the change through the book_changes NOTIFY trigger
+    db_book.updated_at = datetime.utcnow()
     
     session.add(db_book)
     session.commit()
     session.refresh(db_book)
+    await asyncio.to_thread(_index_book, request.app, db_book)
     return db_book
 
 @router.delete("/{book_id}", response_model=dict[str, bool])
 async def delete_book(
     *,
+    request: Request,
     session: Session = Depends(get_session),
     book_id: int,
-    api_key: str = Depends(get_api_key)
+    api_key: str = Depends(standard_rate_limit)
 ) -> Any:
     """
     Delete a specific book.
     
     Args:
+        request: Incoming request, used to reach the in-memory indexes
         session: Database session
         book_id: ID of the book to delete
         api_key: API key for authentication
@@ -149,7 +205,9 @@ async def delete_book(
     book = session.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    
+        
     session.delete(book)
     session.commit()
+    request.app.state.catalogue.discard(book_id)
+    request.app.state.duplicates.discard(book_id)
     return {"ok": True}
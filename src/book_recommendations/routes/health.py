@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from typing import Any
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+@router.get("/live")
+async def liveness() -> Any:
+    """
+    Report that the process is up and serving requests.
+    
+    Does not touch the database or models, so it stays cheap for frequent
+    probes. No API key is required.
+    
+    Returns:
+        dict[str, str]: Liveness status
+    """
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness(request: Request) -> Any:
+    """
+    Report whether the worker is ready to receive traffic.
+    
+    Responds with 503 while the catalogue and models are still loading
+    ("warming"), when the database schema is behind the Alembic head
+    ("schema_outdated") or when warm-up failed ("failed"). No API key is
+    required.
+    
+    Args:
+        request: Incoming request, used to read the application state
+        
+    Returns:
+        dict[str, Any]: Readiness status and catalogue size, 0 on shard
+            processes, which keep no catalogue
+    """
+    state = getattr(request.app.state, "readiness", "warming")
+    catalogue = request.app.state.catalogue
+    body = {"status": state, "books": len(catalogue) if catalogue is not None else 0}
+    if state != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
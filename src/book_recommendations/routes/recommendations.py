@@ -1,29 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List, Any
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlmodel import Session
+from typing import List, Any, Optional
 from ..models.Book import Book, BookRead
-from ..lib.dependencies import get_session
-from ..lib.book_recommender import BookRecommender
-from ..lib.security import get_api_key
+from ..lib.database import replicas
+from ..lib.dependencies import last_write_at
+from ..lib.book_recommender import BookRecommender, MAX_RECOMMENDATIONS, RecommenderOverloaded
+from ..lib.sharding import ShardsUnavailable
+from ..lib.rate_limit import standard_rate_limit, ai_rate_limit
 
 router = APIRouter(
     prefix="/recommendations",
     tags=["recommendations"],
 )
 
+async def _source_book(
+    recommender: BookRecommender, session: Session, book_id: int, use_primary: bool
+) -> Optional[BookRead]:
+    """
+    Look up the book recommendations are computed for.
+    
+    Served from the in-memory catalogue; only clients that just wrote, or
+    books the catalogue does not hold yet, go to the database, in a worker
+    thread so a hanging replica cannot stall the event loop.
+    """
+    catalogue = recommender.catalogue
+    if not use_primary and catalogue is not None and catalogue.loaded:
+        book = catalogue.get_many([book_id])[0]
+        if book is not None:
+            return book
+    return await asyncio.to_thread(session.get, Book, book_id)
+
+async def _traditional_recommendations(
+    recommender: BookRecommender, book_id: int, limit: int, use_primary: bool
+) -> List[BookRead]:
+    """Compute traditional recommendations shared by coalesced requests."""
+    # The computation can outlive the request that started it, so it
+    # owns its session instead of borrowing the request-scoped one
+    async with replicas.async_session(use_primary=use_primary) as session:
+        book = await _source_book(recommender, session, book_id, use_primary)
+        if not book:
+            raise HTTPException(status_code=404, detail="Book not found")
+            
+        try:
+            recommendations = await recommender.get_traditional_recommendations(
+                book, limit, session=session
+            )
+        except RecommenderOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Recommender is busy, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        except ShardsUnavailable:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Recommender shards are unavailable",
+                headers={"Retry-After": "1"},
+            )
+        return [BookRead.model_validate(b) for b in recommendations]
+
+async def _ai_recommendations(
+    recommender: BookRecommender, book_id: int, limit: int, use_primary: bool
+) -> List[str]:
+    """Compute AI recommendations shared by coalesced requests."""
+    async with replicas.async_session(use_primary=use_primary) as session:
+        book = await _source_book(recommender, session, book_id, use_primary)
+        if not book:
+            raise HTTPException(status_code=404, detail="Book not found")
+            
+        return await recommender.get_ai_recommendations(book, limit)
+
 @router.get("/traditional/{book_id}", response_model=List[BookRead])
 async def get_traditional_recommendations(
     *,
-    session: Session = Depends(get_session),
+    request: Request,
     book_id: int,
-    limit: int = 5,
-    api_key: str = Depends(get_api_key)
+    limit: int = Query(default=5, ge=1, le=MAX_RECOMMENDATIONS),
+    api_key: str = Depends(standard_rate_limit)
 ) -> Any:
     """
     Get book recommendations based on traditional similarity metrics.
     
+    Concurrent identical requests share a single computation.
+    
     Args:
-        session: Database session
+        request: Incoming request, used to reach the shared recommender
         book_id: ID of the book to get recommendations for
         limit: Maximum number of recommendations to return
         api_key: API key for authentication
@@ -32,29 +94,34 @@ async def get_traditional_recommendations(
         List[BookRead]: List of recommended books
         
     Raises:
-        HTTPException: If book is not found or authentication fails
+        HTTPException: If book is not found, authentication fails, the
+            rate limit is exceeded, the recommender is saturated or no
+            recommender shard answered
     """
-    book = session.get(Book, book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    
-    recommender = BookRecommender(session)
-    recommendations = recommender.get_traditional_recommendations(book, limit)
-    return recommendations
+    recommender = request.app.state.recommender
+    # Callers that just wrote read from the primary, so they never share
+    # a replica-backed computation
+    use_primary = replicas.wants_primary(last_write_at(request))
+    return await request.app.state.inflight.do(
+        ("traditional", book_id, limit, use_primary),
+        lambda: _traditional_recommendations(recommender, book_id, limit, use_primary),
+    )
 
 @router.get("/ai/{book_id}", response_model=List[str])
 async def get_ai_recommendations(
     *,
-    session: Session = Depends(get_session),
+    request: Request,
     book_id: int,
-    limit: int = 5,
-    api_key: str = Depends(get_api_key)
+    limit: int = Query(default=5, ge=1, le=MAX_RECOMMENDATIONS),
+    api_key: str = Depends(ai_rate_limit)
 ) -> Any:
     """
     Get AI-enhanced book recommendations.
     
+    Concurrent identical requests share a single model call.
+    
     Args:
-        session: Database session
+        request: Incoming request, used to reach the shared recommender
         book_id: ID of the book to get recommendations for
         limit: Maximum number of recommendations to return
         api_key: API key for authentication
@@ -63,12 +130,12 @@ async def get_ai_recommendations(
         List[str]: List of recommended book titles
         
     Raises:
-        HTTPException: If book is not found or authentication fails
+        HTTPException: If book is not found, authentication fails or the
+            rate limit is exceeded
     """
-    book = session.get(Book, book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    
-    recommender = BookRecommender(session)
-    recommendations = await recommender.get_ai_recommendations(book, limit)
-    return recommendations
+    recommender = request.app.state.recommender
+    use_primary = replicas.wants_primary(last_write_at(request))
+    return await request.app.state.inflight.do(
+        ("ai", book_id, limit, use_primary),
+        lambda: _ai_recommendations(recommender, book_id, limit, use_primary),
+    )
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import Any
+from ..models.Shard import ShardMatch, ShardSearchRequest, ShardSearchResponse
+from ..lib.config import SHARD_ID
+from ..lib.book_recommender import RecommenderOverloaded
+from ..lib.security import get_shard_token
+
+# Called by the coordinator only, so it is left out of the public docs
+router = APIRouter(
+    prefix="/internal/shard",
+    tags=["internal"],
+    include_in_schema=False,
+)
+
+@router.post("/search", response_model=ShardSearchResponse)
+async def search_shard(
+    *,
+    request: Request,
+    query: ShardSearchRequest,
+    shard_token: str = Depends(get_shard_token)
+) -> Any:
+    """
+    Score the books held by this shard against a query document.
+    
+    Not rate limited, since every public recommendation request fans out
+    into one call per shard; callers authenticate with SHARD_TOKEN instead
+    of the public API key.
+    
+    Args:
+        request: Incoming request, used to reach the shard's recommender
+        query: Query document, result limit and book to exclude
+        shard_token: Shared coordinator token for authentication
+        
+    Returns:
+        ShardSearchResponse: This shard's top matches, best first
+        
+    Raises:
+        HTTPException: If authentication fails, the index is not loaded yet
+            or the recommender is saturated
+    """
+    try:
+        matches = await request.app.state.recommender.search(
+            query.document, query.limit, exclude_id=query.exclude_id
+        )
+    except RecommenderOverloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommender is busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    if matches is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Shard index is not loaded yet",
+        )
+    return ShardSearchResponse(
+        shard_id=SHARD_ID,
+        results=[ShardMatch(book_id=book_id, score=score) for book_id, score in matches],
+    )
@@ -0,0 +1,5 @@
+import os
+
+# lib.config reads these at import time; keep tests independent of .env
+os.environ.setdefault("PORT", "6969")
+os.environ.setdefault("POSTGRES_URL", "sqlite://")
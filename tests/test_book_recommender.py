@@ -0,0 +1,155 @@
+import asyncio
+import numpy as np
+import pytest
+from book_recommendations.lib.book_recommender import (
+    BookRecommender,
+    LatentSemanticVectorizer,
+    _dense_scores,
+    book_document,
+    build_tfidf_index,
+)
+from book_recommendations.lib.dedup import DuplicateIndex
+from book_recommendations.models import Book
+
+def make_book(book_id: int, description: str, genres=("fiction",)) -> Book:
+    return Book(id=book_id, title=f"Book {book_id}", author="Anon", description=description, genres=list(genres))
+
+CATALOGUE = [
+    make_book(1, "wizards and dragons in a magical kingdom"),
+    make_book(2, "detectives solve a murder in foggy london"),
+    make_book(3, "astronauts explore a distant galaxy aboard a starship"),
+]
+
+def fit(books):
+    return build_tfidf_index([book_document(book) for book in books], components=0)
+
+def indexed_ids(recommender):
+    return sorted(int(book_id) for book_id in recommender._index[2])
+
+def test_changes_during_rebuild_are_replayed_onto_new_index():
+    async def scenario():
+        recommender = BookRecommender()
+        recommender.begin_rebuild()
+        # The rebuild reads its documents, then changes arrive before it installs
+        tfidf, matrix = fit(CATALOGUE)
+        await recommender.update_books(
+            [
+                make_book(2, "wizards duel dragons over a magical kingdom"),
+                make_book(4, "a starship crew explores the galaxy"),
+            ],
+            deleted_ids=[3],
+        )
+        await recommender.load_index(tfidf, matrix, [book.id for book in CATALOGUE])
+        return recommender
+        
+    recommender = asyncio.run(scenario())
+    assert indexed_ids(recommender) == [1, 2, 4]
+    assert recommender._score(1, 1)[0][0] == 2
+    assert recommender._change_log is None
+
+def test_changes_after_end_rebuild_are_not_logged():
+    async def scenario():
+        recommender = BookRecommender()
+        recommender.begin_rebuild()
+        recommender.end_rebuild()
+        await recommender.update_books([make_book(4, "cooking with fresh herbs")])
+        tfidf, matrix = fit(CATALOGUE)
+        await recommender.load_index(tfidf, matrix, [book.id for book in CATALOGUE])
+        return recommender
+        
+    assert indexed_ids(asyncio.run(scenario())) == [1, 2, 3]
+
+def test_update_books_patches_installed_index():
+    async def scenario():
+        recommender = BookRecommender()
+        tfidf, matrix = fit(CATALOGUE)
+        await recommender.load_index(tfidf, matrix, [book.id for book in CATALOGUE])
+        await recommender.update_books([make_book(5, "murder mystery for a london detective")], deleted_ids=[1])
+        return recommender
+        
+    recommender = asyncio.run(scenario())
+    assert indexed_ids(recommender) == [2, 3, 5]
+    assert recommender._score(5, 1)[0][0] == 2
+
+def test_rank_widens_fetch_when_editions_crowd_out_results():
+    source = make_book(1, "wizards and dragons in a magical kingdom")
+    # Twelve editions of one work outscore everything else
+    editions = [
+        Book(id=book_id, title="Dragon Saga", author="Anon", description="wizards and dragons rule a magical kingdom", genres=["fiction"])
+        for book_id in range(10, 22)
+    ]
+    others = [
+        make_book(30, "dragons guard a mountain of gold"),
+        make_book(31, "young wizards learn to cast spells"),
+        make_book(32, "a kingdom falls to war"),
+    ]
+    books = [source, *editions, *others]
+    duplicates = DuplicateIndex()
+    for book in books:
+        duplicates.upsert(book)
+        
+    async def scenario():
+        recommender = BookRecommender(duplicates=duplicates)
+        tfidf, matrix = fit(books)
+        await recommender.load_index(tfidf, matrix, [book.id for book in books])
+        return recommender
+        
+    recommender = asyncio.run(scenario())
+    # The first fetch of 9 holds only editions, which collapse to one result
+    ids = recommender._rank(1, 9, 3)
+    assert len(ids) == 3
+    assert ids[0] in range(10, 22)
+    assert set(ids[1:]) <= {30, 31, 32}
+
+LIBRARY = [
+    *CATALOGUE,
+    make_book(4, "a young wizard befriends a dragon"),
+    make_book(5, "inspectors hunt a killer through london streets"),
+    make_book(6, "a starship crew lost beyond the galaxy"),
+    make_book(7, "dragons and wizards battle for the kingdom"),
+    make_book(8, "a detective story set in victorian london"),
+]
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_latent_index_stores_unit_vectors_at_dtype(dtype):
+    vectorizer, vectors = build_tfidf_index([book_document(book) for book in LIBRARY], components=4, dtype=dtype)
+    
+    assert isinstance(vectorizer, LatentSemanticVectorizer)
+    assert vectors.shape == (len(LIBRARY), 4)
+    assert vectors.dtype == np.dtype(dtype)
+    assert vectorizer.svd.components_.dtype == np.dtype(dtype)
+    norms = np.linalg.norm(vectors.astype(np.float64), axis=1)
+    assert np.allclose(norms, 1.0, atol=1e-2)
+
+def test_latent_index_caps_vocabulary():
+    vectorizer, _ = build_tfidf_index([book_document(book) for book in LIBRARY], components=4, max_features=10)
+    assert len(vectorizer.tfidf.vocabulary_) == 10
+    assert vectorizer.svd.components_.shape == (4, 10)
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_dense_scores_match_float64_reference(dtype):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 16))
+    query = rng.standard_normal(16)
+    
+    # A small block size exercises the blocked float16 path
+    scores = _dense_scores(vectors.astype(dtype), query, block_size=64)
+    
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, vectors @ query, atol=0.05, rtol=0.01)
+
+def test_update_books_projects_new_books_into_latent_space():
+    async def scenario():
+        recommender = BookRecommender()
+        vectorizer, vectors = build_tfidf_index([book_document(book) for book in LIBRARY], components=4)
+        await recommender.load_index(vectorizer, vectors, [book.id for book in LIBRARY])
+        await recommender.update_books([make_book(9, "wizards tame dragons in a magical kingdom")])
+        return recommender
+        
+    recommender = asyncio.run(scenario())
+    _, matrix, book_ids, _ = recommender._index
+    assert isinstance(matrix, np.ndarray)
+    assert matrix.shape == (len(LIBRARY) + 1, 4)
+    assert matrix.dtype == np.float32
+    # The new book lands next to the other wizard and dragon books
+    assert recommender._score(9, 1)[0][0] in {1, 4, 7}
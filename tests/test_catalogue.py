@@ -0,0 +1,119 @@
+import random
+from datetime import datetime
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from book_recommendations.lib.catalogue import BookCatalogue
+from book_recommendations.models import Book, BookRead
+
+def make_book(book_id: int, title: str = None, **fields) -> Book:
+    values = dict(
+        title=title or f"Title {book_id}",
+        author=f"Author {book_id % 3}",
+        description="Shared description" if book_id % 2 else f"Description {book_id}",
+        isbn=f"isbn-{book_id}" if book_id % 4 else None,
+        genres=["fiction", "classic"][: book_id % 3],
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1 + book_id % 28),
+    )
+    values.update(fields)
+    return Book(id=book_id, **values)
+
+def dumped(books):
+    return [book.model_dump() if book is not None else None for book in books]
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(make_book(book_id) for book_id in range(1, 21))
+        session.commit()
+        yield session
+
+def test_load_round_trips_every_column(session):
+    catalogue = BookCatalogue()
+    catalogue.load(session)
+    
+    assert catalogue.loaded
+    assert len(catalogue) == 20
+    expected = [BookRead.model_validate(make_book(book_id)) for book_id in (7, 1, 20)]
+    assert dumped(catalogue.get_many([7, 1, 20])) == dumped(expected)
+
+def test_get_many_preserves_order_and_reports_missing(session):
+    catalogue = BookCatalogue()
+    catalogue.load(session)
+    
+    books = catalogue.get_many([5, 999, 3, 5])
+    assert [book.id if book else None for book in books] == [5, None, 3, 5]
+    assert catalogue.get_many([]) == []
+
+def test_overlay_shadows_snapshot(session):
+    catalogue = BookCatalogue()
+    catalogue.load(session)
+    
+    catalogue.upsert(make_book(3, title="Revised"))
+    catalogue.upsert(make_book(50))
+    catalogue.discard(4)
+    
+    three, four, fifty = catalogue.get_many([3, 4, 50])
+    assert three.title == "Revised"
+    assert four is None
+    assert fifty.id == 50
+    assert len(catalogue) == 20
+    
+    catalogue.upsert(make_book(4))
+    assert catalogue.get_many([4])[0].id == 4
+
+def test_compaction_folds_overlay_into_snapshot(session):
+    catalogue = BookCatalogue(compact_ratio=0.1, min_compact=2)
+    catalogue.load(session)
+    
+    catalogue.discard(1)
+    for book_id in (2, 30, 31):
+        catalogue.upsert(make_book(book_id, title=f"New {book_id}"))
+        
+    columns, overlay, deleted = catalogue._state
+    assert not overlay and not deleted
+    assert len(columns) == 21
+    assert [book.title if book else None for book in catalogue.get_many([1, 2, 30, 31])] == [
+        None, "New 2", "New 30", "New 31"
+    ]
+
+def test_matches_dict_model_across_random_changes():
+    rng = random.Random(0)
+    catalogue = BookCatalogue(compact_ratio=0.1, min_compact=5)
+    model = {}
+    for step in range(1000):
+        book_id = rng.randint(1, 200)
+        if rng.random() < 0.6:
+            book = make_book(book_id, title=f"Title {book_id} v{step}")
+            model[book_id] = BookRead.model_validate(book)
+            catalogue.upsert(book)
+        else:
+            model.pop(book_id, None)
+            catalogue.discard(book_id)
+            
+    ids = list(range(0, 202))
+    assert dumped(catalogue.get_many(ids)) == dumped(model.get(book_id) for book_id in ids)
+    assert len(catalogue) == len(model)
+
+def test_load_replays_changes_made_while_reading(session):
+    catalogue = BookCatalogue()
+    
+    class RacingSession:
+        """Applies changes between the snapshot query and the swap."""
+        
+        def exec(self, statement):
+            result = session.exec(statement)
+            catalogue.upsert(make_book(2, title="Changed during load"))
+            catalogue.upsert(make_book(40))
+            catalogue.discard(3)
+            return result
+            
+    catalogue.load(RacingSession())
+    
+    two, three, forty = catalogue.get_many([2, 3, 40])
+    assert two.title == "Changed during load"
+    assert three is None
+    assert forty.id == 40
+    assert len(catalogue) == 20
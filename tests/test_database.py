@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+from book_recommendations.lib import database
+from book_recommendations.lib.database import ReplicaRouter
+
+def alembic_head() -> str:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    
+    config = Config()
+    config.set_main_option("script_location", database.ALEMBIC_SCRIPT_LOCATION)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+@pytest.fixture
+def stamp(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(database, "engine", engine)
+    
+    def stamp(*revisions):
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+            connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+            for revision in revisions:
+                connection.execute(text("INSERT INTO alembic_version VALUES (:rev)"), {"rev": revision})
+                
+    return stamp
+
+def test_schema_at_head_is_current(stamp):
+    stamp(alembic_head())
+    assert database.schema_is_current()
+
+def test_schema_behind_head_is_outdated(stamp):
+    stamp("9c3f6a2e1b85")
+    assert not database.schema_is_current()
+
+def test_unmigrated_schema_is_outdated(stamp):
+    stamp()
+    assert not database.schema_is_current()
+
+def test_schema_ahead_of_this_release_is_accepted(stamp):
+    # A revision added by a newer release during a rolling deploy
+    stamp("ffffffffffff")
+    assert database.schema_is_current()
+
+class FakeReplica:
+    """Engine stand-in whose connect() fails while `up` is False."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.up = True
+        self.attempts = 0
+        
+    def connect(self):
+        self.attempts += 1
+        if not self.up:
+            raise OperationalError("connect", {}, ConnectionRefusedError(self.name))
+        return self.name
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        database, "time", SimpleNamespace(monotonic=lambda: clock.now, time=lambda: clock.now)
+    )
+    return clock
+
+def test_replicas_are_used_round_robin(clock):
+    router = ReplicaRouter([FakeReplica("a"), FakeReplica("b")])
+    assert [router._connect() for _ in range(4)] == ["a", "b", "a", "b"]
+
+def test_failed_replica_fails_over_and_sits_out(clock):
+    a, b = FakeReplica("a"), FakeReplica("b")
+    a.up = False
+    router = ReplicaRouter([a, b], retry_after=30)
+    
+    assert [router._connect() for _ in range(3)] == ["b", "b", "b"]
+    assert a.attempts == 1
+    
+    a.up = True
+    clock.now += 30
+    assert {router._connect() for _ in range(2)} == {"a", "b"}
+
+def test_no_healthy_replica_falls_back_to_primary(clock, monkeypatch):
+    primary = create_engine("sqlite://")
+    monkeypatch.setattr(database, "engine", primary)
+    down = FakeReplica("a")
+    down.up = False
+    router = ReplicaRouter([down])
+    
+    async def bind():
+        async with router.async_session() as session:
+            return session.get_bind()
+            
+    assert router._connect() is None
+    assert asyncio.run(bind()) is primary
+
+def test_wants_primary_within_sticky_window(clock):
+    router = ReplicaRouter([FakeReplica("a")], sticky_for=10)
+    
+    assert not router.wants_primary(None)
+    assert router.wants_primary(clock.now - 5)
+    assert not router.wants_primary(clock.now - 10)
+    # Timestamps from the future are not trusted
+    assert not router.wants_primary(clock.now + 5)
+
+def test_wants_primary_without_replicas():
+    assert ReplicaRouter([]).wants_primary(None)
@@ -0,0 +1,111 @@
+import numpy as np
+from book_recommendations.lib.dedup import (
+    DuplicateIndex,
+    dedup_document,
+    minhash_signature,
+    minhash_signatures,
+)
+from book_recommendations.models import Book
+
+GATSBY = "Jay Gatsby throws lavish parties at his West Egg mansion hoping to win back Daisy Buchanan"
+MOBY = "Captain Ahab hunts the white whale across the oceans with the crew of the Pequod"
+EMMA = "Emma Woodhouse meddles in the romantic lives of her friends in the village of Highbury"
+
+def make_book(book_id: int, description: str, title: str = "A novel", author: str = "Anon") -> Book:
+    return Book(id=book_id, title=title, author=author, description=description, genres=[])
+
+def loaded_index(books):
+    index = DuplicateIndex()
+    index.load(
+        [book.id for book in books],
+        minhash_signatures([dedup_document(book) for book in books]),
+    )
+    return index
+
+def test_signature_is_deterministic():
+    signature = minhash_signature(GATSBY)
+    assert signature.dtype == np.uint32
+    assert np.array_equal(signature, minhash_signature(GATSBY.upper()))
+    assert not np.array_equal(signature, minhash_signature(MOBY))
+
+def test_find_returns_lsh_candidates_above_threshold():
+    index = loaded_index([
+        make_book(1, GATSBY),
+        make_book(2, GATSBY),
+        make_book(3, GATSBY + " in the summer"),
+        make_book(4, MOBY),
+        make_book(5, EMMA),
+    ])
+    
+    matches = index.find(make_book(1, GATSBY))
+    assert [book_id for book_id, _ in matches] == [2, 3]
+    assert matches[0][1] == 1.0
+    assert index.find(make_book(4, MOBY)) == []
+
+def test_find_respects_threshold_and_limit():
+    index = loaded_index([make_book(1, GATSBY), make_book(2, GATSBY), make_book(3, GATSBY)])
+    
+    assert len(index.find(make_book(1, GATSBY), limit=1)) == 1
+    assert index.find(make_book(9, EMMA), threshold=0.0) == []
+
+def test_find_sees_overlay_and_removals():
+    index = loaded_index([make_book(1, GATSBY), make_book(2, GATSBY)])
+    
+    index.upsert(make_book(3, GATSBY))
+    index.discard(2)
+    assert [book_id for book_id, _ in index.find(make_book(1, GATSBY))] == [3]
+    
+    index.upsert(make_book(2, MOBY))
+    assert [book_id for book_id, _ in index.find(make_book(1, GATSBY))] == [3]
+
+def test_compaction_keeps_matches():
+    index = DuplicateIndex(compact_size=2)
+    for book_id in (1, 2, 3):
+        index.upsert(make_book(book_id, GATSBY))
+    index.upsert(make_book(4, MOBY))
+    
+    assert [book_id for book_id, _ in index.find(make_book(1, GATSBY))] == [2, 3]
+
+def test_texts_without_tokens_never_match():
+    index = loaded_index([make_book(1, "", title="", author=""), make_book(2, "", title="", author="")])
+    index.upsert(make_book(3, "", title="...", author="--"))
+    
+    assert index.find(make_book(1, "", title="", author="")) == []
+    assert index.similarity(1, 2) == 0.0
+    assert index.filter_ranked(1, [2, 3], limit=5) == [2, 3]
+
+def test_filter_ranked_drops_duplicates_of_source_and_earlier_results():
+    index = loaded_index([
+        make_book(1, GATSBY),
+        make_book(2, MOBY),
+        make_book(3, GATSBY),
+        make_book(4, MOBY),
+        make_book(5, EMMA),
+    ])
+    
+    assert index.filter_ranked(1, [3, 2, 4, 5], limit=5) == [2, 5]
+    assert index.filter_ranked(1, [3, 2, 4, 5], limit=1) == [2]
+    assert index.filter_ranked(1, [99, 2], limit=5) == [99, 2]
+
+def test_changes_during_load_are_replayed():
+    books = [make_book(1, GATSBY), make_book(2, MOBY), make_book(3, GATSBY)]
+    index = DuplicateIndex()
+    index.begin_load()
+    # Signatures are computed from a snapshot, then changes arrive before the swap
+    signatures = minhash_signatures([dedup_document(book) for book in books])
+    index.upsert(make_book(2, GATSBY))
+    index.upsert(make_book(4, GATSBY))
+    index.discard(3)
+    index.load([book.id for book in books], signatures)
+    
+    assert [book_id for book_id, _ in index.find(make_book(1, GATSBY))] == [2, 4]
+    assert index.signature(3) is None
+
+def test_end_load_stops_recording():
+    index = DuplicateIndex()
+    index.begin_load()
+    index.end_load()
+    index.upsert(make_book(2, GATSBY))
+    index.load([1], minhash_signatures([dedup_document(make_book(1, GATSBY))]))
+    
+    assert index.find(make_book(1, GATSBY)) == []
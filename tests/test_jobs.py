@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from book_recommendations.lib import jobs
+from book_recommendations.lib.jobs import JobRunner
+from book_recommendations.models import Book, Job
+from book_recommendations.models.Job import JOB_CANCELLED, JOB_RUNNING
+
+@pytest.fixture
+def engine(monkeypatch):
+    # One shared connection, so worker threads see the same in-memory database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(jobs, "engine", engine)
+    return engine
+
+def test_load_documents_reads_plain_rows(engine):
+    with Session(engine) as session:
+        session.add(Book(id=2, title="B", author="Y", description="second", genres=["poetry"]))
+        session.add(Book(id=1, title="A", author="X", description="first", genres=[]))
+        session.commit()
+        
+    book_ids, documents, dedup_documents = jobs._load_documents()
+    assert book_ids == [1, 2]
+    assert documents == ["A first ", "B second poetry"]
+    assert dedup_documents == ["A X first", "B Y second"]
+
+def test_first_stored_shard_vectorizer_wins(engine):
+    assert jobs._load_vectorizer() is None
+    assert jobs._store_vectorizer(b"first", 10, replace=False) is None
+    # A shard that fitted its own meanwhile gets the stored one back
+    assert jobs._store_vectorizer(b"second", 10, replace=False) == b"first"
+    assert jobs._store_vectorizer(b"refit", 20, replace=True) is None
+    assert jobs._load_vectorizer() == b"refit"
+
+def test_cancel_reaches_job_running_on_another_worker(engine):
+    async def scenario():
+        owner = JobRunner(app=None, heartbeat_interval=0.01)
+        other = JobRunner(app=None, heartbeat_interval=0.01)
+        started = asyncio.Event()
+        
+        async def forever(ctx):
+            started.set()
+            await asyncio.sleep(3600)
+            
+        owner.register("forever", forever)
+        job = await owner.submit("forever")
+        await started.wait()
+        owner.start()
+        
+        assert await other.cancel(job.id)
+        final = await asyncio.wait_for(owner.wait(job.id), 5)
+        await owner.shutdown()
+        return final
+        
+    assert asyncio.run(scenario()).status == JOB_CANCELLED
+
+def test_cancel_of_finished_job_is_refused(engine):
+    async def scenario():
+        runner = JobRunner(app=None)
+        
+        async def quick(ctx):
+            return None
+            
+        runner.register("quick", quick)
+        job = await runner.submit("quick")
+        await runner.wait(job.id)
+        return await runner.cancel(job.id)
+        
+    assert asyncio.run(scenario()) is False
+
+def test_heartbeat_reports_requested_cancellations(engine):
+    with Session(engine) as session:
+        job = Job(kind="rebuild_index", status=JOB_RUNNING)
+        session.add(job)
+        session.commit()
+        job_id = job.id
+        
+    assert jobs._heartbeat([job_id], stale_after=60) == (0, [])
+    assert jobs._request_cancel(job_id)
+    assert jobs._heartbeat([job_id], stale_after=60) == (0, [job_id])
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from book_recommendations.lib import notifications
+from book_recommendations.lib.notifications import BookChangeListener
+
+class FakeConnection:
+    """Enough of an asyncpg connection for the listener."""
+    
+    def __init__(self):
+        self.listening = False
+        self.closed = False
+        
+    async def add_listener(self, channel, callback):
+        self.listening = True
+        
+    def is_closed(self) -> bool:
+        return self.closed
+        
+    async def close(self) -> None:
+        self.closed = True
+
+class FakeDatabase:
+    """Hands out connections, failing while `down` is set."""
+    
+    def __init__(self, down: bool = False):
+        self.down = down
+        self.connections = []
+        
+    async def connect(self, dsn):
+        if self.down:
+            raise OSError("connection refused")
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(notifications.asyncpg, "connect", database.connect)
+    return database
+
+def make_listener(loaded: bool = False):
+    app = SimpleNamespace(state=SimpleNamespace(catalogue=SimpleNamespace(loaded=loaded)))
+    listener = BookChangeListener(app, retry_delay=0.01)
+    listener.resyncs = 0
+    
+    async def resync():
+        listener.resyncs += 1
+        
+    listener._resync = resync
+    return listener
+
+async def eventually(condition, timeout: float = 2.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+            
+    await asyncio.wait_for(poll(), timeout)
+
+def test_start_returns_once_listening(database):
+    async def scenario():
+        database.down = True
+        listener = make_listener()
+        start = asyncio.ensure_future(listener.start())
+        await asyncio.sleep(0.05)
+        assert not start.done()
+        
+        database.down = False
+        await asyncio.wait_for(start, 2)
+        assert database.connections[-1].listening
+        await listener.stop()
+        return listener.resyncs
+        
+    assert asyncio.run(scenario()) == 0
+
+def test_first_connect_after_load_resyncs(database):
+    async def scenario():
+        listener = make_listener(loaded=True)
+        await listener.start()
+        await eventually(lambda: listener.resyncs == 1)
+        await listener.stop()
+        
+    asyncio.run(scenario())
+
+def test_reconnect_resyncs(database):
+    async def scenario():
+        listener = make_listener()
+        await listener.start()
+        assert listener.resyncs == 0
+        
+        database.connections[-1].closed = True
+        await eventually(lambda: listener.resyncs == 1)
+        await listener.stop()
+        
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from book_recommendations.lib import rate_limit
+from book_recommendations.lib.rate_limit import LocalBucketStore, RateLimiter
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+        
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+def take(store, key="key", capacity=3, rate=1.0):
+    return asyncio.run(store.take(key, capacity, rate))
+
+def test_burst_up_to_capacity_then_reject(clock):
+    store = LocalBucketStore()
+    
+    assert [take(store) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert take(store) == pytest.approx(1.0)
+
+def test_tokens_refill_at_rate(clock):
+    store = LocalBucketStore()
+    for _ in range(3):
+        take(store)
+        
+    clock.now += 0.5
+    assert take(store) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert take(store) == 0.0
+
+def test_refill_is_capped_at_capacity(clock):
+    store = LocalBucketStore()
+    take(store)
+    
+    clock.now += 3600
+    assert [take(store) for _ in range(4)][-1] > 0
+
+def test_buckets_are_independent(clock):
+    store = LocalBucketStore()
+    for _ in range(3):
+        take(store, key="a")
+        
+    assert take(store, key="a") > 0
+    assert take(store, key="b") == 0.0
+
+def test_full_buckets_are_pruned(clock):
+    store = LocalBucketStore(max_buckets=2)
+    take(store, key="a")
+    take(store, key="b")
+    
+    clock.now += 60
+    take(store, key="c")
+    assert set(store._buckets) == {"c"}
+
+def test_failing_shared_store_is_skipped_during_cooldown(clock):
+    class FailingStore:
+        calls = 0
+        
+        async def take(self, key, capacity, rate):
+            self.calls += 1
+            raise ConnectionError("database is down")
+            
+    store = FailingStore()
+    limiter = RateLimiter(store, limits={"standard": 60}, cooldown=30)
+    
+    assert asyncio.run(limiter.hit("key", "standard")) == 0.0
+    assert asyncio.run(limiter.hit("key", "standard")) == 0.0
+    assert store.calls == 1
+    
+    clock.now += 30
+    asyncio.run(limiter.hit("key", "standard"))
+    assert store.calls == 2
@@ -0,0 +1,117 @@
+import asyncio
+import httpx
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+from book_recommendations.lib import sharding
+from book_recommendations.lib.book_recommender import BookRecommender, book_document, fit_vectorizer, vectorize
+from book_recommendations.lib.sharding import ShardCoordinator, ShardsUnavailable, owns_book, shard_filter
+from book_recommendations.models import Book
+
+BOOK_IDS = range(1, 60)
+
+@pytest.fixture(scope="module")
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for book_id in BOOK_IDS:
+            session.add(Book(id=book_id, title=f"Book {book_id}", author="Anon", description="", genres=[]))
+        session.commit()
+        yield session
+
+def test_owns_book_hash_partition():
+    assert [owns_book(book_id, 1, 3, "hash") for book_id in range(6)] == [False, True, False, False, True, False]
+
+def test_owns_book_range_partition_last_shard_takes_the_rest():
+    assert owns_book(9, 0, 3, "range", 10)
+    assert owns_book(10, 1, 3, "range", 10)
+    assert owns_book(25, 2, 3, "range", 10)
+    assert owns_book(1000, 2, 3, "range", 10)
+    assert not owns_book(1000, 1, 3, "range", 10)
+
+def test_owns_book_without_sharding():
+    assert owns_book(7, 0, 1)
+
+@pytest.mark.parametrize("partition", ["hash", "range"])
+def test_shard_filter_selects_the_books_each_shard_owns(session, partition):
+    selected = []
+    for shard_id in range(3):
+        query = select(Book.id).where(shard_filter(Book.id, shard_id, 3, partition, 10))
+        book_ids = sorted(session.exec(query).all())
+        assert book_ids == [book_id for book_id in BOOK_IDS if owns_book(book_id, shard_id, 3, partition, 10)]
+        selected.extend(book_ids)
+    # Every book belongs to exactly one shard
+    assert sorted(selected) == list(BOOK_IDS)
+
+def test_shard_filter_without_sharding_selects_everything(session):
+    assert len(session.exec(select(Book.id).where(shard_filter(Book.id, 0, 1))).all()) == len(BOOK_IDS)
+
+def make_coordinator(monkeypatch, shards, timeout=0.2):
+    """Coordinator whose shards answer through `shards`, a handler per host."""
+    monkeypatch.setattr(sharding, "SHARD_TOKEN", "secret")
+    coordinator = ShardCoordinator([f"http://{host}" for host in shards], timeout=timeout)
+    
+    async def handle(request):
+        return await shards[request.url.host](request)
+        
+    coordinator._client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    return coordinator
+
+def answer(*matches):
+    async def handler(request):
+        results = [{"book_id": book_id, "score": score} for book_id, score in matches]
+        return httpx.Response(200, json={"shard_id": 0, "results": results})
+        
+    return handler
+
+async def broken(request):
+    return httpx.Response(500)
+
+async def slow(request):
+    await asyncio.sleep(5)
+    return httpx.Response(200, json={"shard_id": 0, "results": []})
+
+def test_search_merges_shards_best_first(monkeypatch):
+    coordinator = make_coordinator(monkeypatch, {
+        "a": answer((1, 0.9), (3, 0.5)),
+        "b": answer((2, 0.7), (4, 0.1)),
+    })
+    assert asyncio.run(coordinator.search("query", 3)) == [(1, 0.9), (2, 0.7), (3, 0.5)]
+
+def test_search_skips_failed_and_timed_out_shards(monkeypatch):
+    coordinator = make_coordinator(monkeypatch, {"a": answer((1, 0.9)), "b": broken, "c": slow})
+    assert asyncio.run(coordinator.search("query", 3)) == [(1, 0.9)]
+
+def test_search_fails_when_no_shard_answers(monkeypatch):
+    coordinator = make_coordinator(monkeypatch, {"a": broken, "b": slow})
+    with pytest.raises(ShardsUnavailable):
+        asyncio.run(coordinator.search("query", 3))
+
+def test_shards_sharing_a_vectorizer_score_like_one_index():
+    books = [
+        Book(id=book_id, title=f"Book {book_id}", author="Anon", description=description, genres=["fiction"])
+        for book_id, description in enumerate([
+            "wizards and dragons in a magical kingdom",
+            "detectives solve a murder in foggy london",
+            "a young wizard befriends a dragon",
+            "astronauts explore a distant galaxy",
+            "dragons guard a wizard's tower",
+            "a london detective hunts a killer",
+        ], start=1)
+    ]
+    vectorizer = fit_vectorizer([book_document(book) for book in books], components=0)
+    
+    async def search(shard_books):
+        recommender = BookRecommender()
+        documents = [book_document(book) for book in shard_books]
+        await recommender.load_index(vectorizer, vectorize(vectorizer, documents), [book.id for book in shard_books])
+        return await recommender.search("wizards and dragons", 10)
+        
+    async def scenario():
+        whole = await search(books)
+        shards = [await search([book for book in books if owns_book(book.id, n, 2)]) for n in range(2)]
+        return whole, sorted((match for shard in shards for match in shard), key=lambda match: -match[1])
+        
+    whole, merged = asyncio.run(scenario())
+    assert [book_id for book_id, _ in merged] == [book_id for book_id, _ in whole]
+    assert [score for _, score in merged] == pytest.approx([score for _, score in whole])
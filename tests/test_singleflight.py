@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from book_recommendations.lib.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_computation():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+            
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        return calls, results, len(flight)
+        
+    calls, results, pending = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [1] * 5
+    assert pending == 0
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+        
+        async def compute(value):
+            await asyncio.sleep(0)
+            return value
+            
+        return await asyncio.gather(
+            flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b"))
+        )
+        
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+def test_finished_call_is_not_cached():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return calls
+            
+        return await flight.do("key", compute), await flight.do("key", compute)
+        
+    assert asyncio.run(scenario()) == (1, 2)
+
+def test_exception_reaches_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+            
+        return await asyncio.gather(
+            flight.do("key", compute), flight.do("key", compute), return_exceptions=True
+        )
+        
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def scenario():
+        flight = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "done"
+            
+        first = asyncio.ensure_future(flight.do("key", compute))
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+        
+    assert asyncio.run(scenario()) == "done"